@@ -7,20 +7,65 @@ This script handles audio capture, processing, and transcription using Whisper.
 """
 
 import argparse
+import functools
+import gc
 import json
 import logging
 import os
+import queue
 import sys
 import threading
 import time
 import json
 import hashlib
-import pickle
+import heapq
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from collections import OrderedDict
-from typing import Dict, List, Optional, Union, Tuple, Any, Set
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Union, Tuple, Any, Set
 from difflib import SequenceMatcher
 
+# Let PyTorch's caching allocator grow segments in place instead of issuing new
+# cudaMalloc calls on every model reload. This only takes effect if it is set
+# before anything creates a CUDA context, so it lives above every torch import.
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
+
+
+def _physical_core_count() -> int:
+    """Return the number of physical CPU cores (half the logical count without psutil)."""
+    try:
+        import psutil
+        cores = psutil.cpu_count(logical=False)
+        if cores:
+            return cores
+    except ImportError:
+        pass
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+# Size the OpenMP/MKL thread pools to physical cores before CTranslate2 or torch
+# create them; hyper-thread siblings only contend for the same SIMD units
+PHYSICAL_CORES = _physical_core_count()
+os.environ.setdefault("OMP_NUM_THREADS", str(PHYSICAL_CORES))
+os.environ.setdefault("MKL_NUM_THREADS", str(PHYSICAL_CORES))
+
+
+def _cpu_has_vnni() -> Optional[bool]:
+    """Return whether the CPU has VNNI int8 dot-product instructions, or None if unknown.
+    
+    Only Linux exposes the CPU flags cheaply (/proc/cpuinfo); elsewhere the answer is unknown.
+    """
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                if line.startswith("flags"):
+                    flags = line.split(":", 1)[1].split()
+                    return "avx512_vnni" in flags or "avx_vnni" in flags
+    except OSError:
+        pass
+    return None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -130,6 +175,34 @@ except ImportError:
 import numpy as np
 import sounddevice as sd
 from faster_whisper import WhisperModel
+from huggingface_hub.utils import LocalEntryNotFoundError
+
+# orjson is optional; it serializes frontend messages straight to bytes much faster than json
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# xxhash is optional; xxh3 hashes audio for the transcription cache far faster than md5
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Saved with the persistent cache: audio keys hashed with another algorithm never match
+AUDIO_HASH = "xxh3_64" if xxhash is not None else "md5"
+
+# rapidfuzz is optional; it scores text similarity in native code instead of difflib
+try:
+    from rapidfuzz import fuzz, process as fuzz_process
+except ImportError:
+    fuzz = None
+
+# pywhispercpp is optional; it backs the low-memory whisper.cpp transcription backend
+try:
+    from pywhispercpp.model import Model as GGMLModel
+except ImportError:
+    GGMLModel = None
 
 # Import local modules
 try:
@@ -141,11 +214,182 @@ except ImportError as e:
     logger.error("Make sure vad.py, wake_word.py, and ide_integration.py are in the same directory")
     # Continue without these modules, they will be handled gracefully
 
+# text_formatter is optional; without it transcriptions are returned unformatted.
+# Imported once here rather than inside transcribe() on every call.
+try:
+    from text_formatter import format_text, detect_language
+except ImportError:
+    format_text = detect_language = None
+
+
+class AudioRingBuffer:
+    """Preallocated single-producer/single-consumer ring buffer of audio samples.
+    
+    The audio callback is the only writer and the transcription thread the only
+    reader. Both positions are monotonically increasing sample counters, so no
+    lock is needed: the producer publishes samples before advancing the head and
+    the consumer only ever advances the tail.
+    """
+    
+    def __init__(self, capacity: int, dtype=np.float32):
+        """Initialize the ring buffer.
+        
+        Args:
+            capacity: Number of samples the buffer can hold
+            dtype: Sample data type
+        """
+        self.capacity = capacity
+        self._buf = np.zeros(capacity, dtype=dtype)
+        self._head = 0  # Total samples written (producer-owned)
+        self._tail = 0  # Total samples consumed (consumer-owned)
+        self._session_start = 0  # Head position when the current session began (producer-owned)
+        self._audio_ready = threading.Condition()
+        self._waiters = 0  # Consumers blocked in wait(), guarded by _audio_ready
+    
+    def write(self, samples: np.ndarray) -> None:
+        """Copy samples into the buffer, overwriting the oldest data when full.
+        
+        Args:
+            samples: 1-D array of samples
+        """
+        n = len(samples)
+        if n == 0:
+            return
+        if n > self.capacity:
+            samples = samples[-self.capacity:]
+            self._head += n - self.capacity
+            n = self.capacity
+        
+        start = self._head % self.capacity
+        first = min(n, self.capacity - start)
+        self._buf[start:start + first] = samples[:first]
+        if first < n:
+            self._buf[:n - first] = samples[first:]
+        
+        self._head += n
+        # Only take the lock when a consumer is actually blocked. A consumer that starts
+        # waiting after this check re-reads the head under the lock before sleeping.
+        if self._waiters:
+            with self._audio_ready:
+                self._audio_ready.notify()
+    
+    def available(self) -> int:
+        """Number of samples written but not yet consumed."""
+        return min(self._head - self._tail, self.capacity)
+    
+    def wait(self, timeout: float, min_samples: int = 1, stop: Optional[Callable[[], bool]] = None) -> bool:
+        """Block until enough unread samples are available.
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            min_samples: Number of unread samples to wait for
+            stop: Optional predicate that ends the wait early when it returns True
+            
+        Returns:
+            True if the wait ended before the timeout, False otherwise
+        """
+        with self._audio_ready:
+            self._waiters += 1
+            try:
+                return self._audio_ready.wait_for(
+                    lambda: self.available() >= min_samples or (stop is not None and stop()),
+                    timeout
+                )
+            finally:
+                self._waiters -= 1
+    
+    def wake(self) -> None:
+        """Wake any waiting consumer so it can re-check its stop condition."""
+        with self._audio_ready:
+            self._audio_ready.notify_all()
+    
+    def read(self, max_samples: int) -> Optional[np.ndarray]:
+        """Consume up to max_samples samples.
+        
+        Like snapshot(), the result is a view into the buffer unless the range
+        wraps, and stays valid until the producer laps it (capacity samples later).
+        
+        Args:
+            max_samples: Maximum number of samples to return
+            
+        Returns:
+            Contiguous samples, or None if nothing is available
+        """
+        head = self._head
+        # Skip anything the producer has already overwritten
+        tail = max(self._tail, head - self.capacity)
+        n = min(head - tail, max_samples)
+        if n <= 0:
+            return None
+        
+        start = tail % self.capacity
+        if start + n <= self.capacity:
+            out = self._buf[start:start + n]
+        else:
+            # Wrapped read: join the two slices once
+            out = np.concatenate((self._buf[start:], self._buf[:n - (self.capacity - start)]))
+        
+        self._tail = tail + n
+        return out
+    
+    @property
+    def position(self) -> int:
+        """Total number of samples consumed so far."""
+        return self._tail
+    
+    def snapshot(self, start: int, end: Optional[int] = None) -> np.ndarray:
+        """Return already-consumed samples between two positions.
+        
+        The result is a view into the buffer unless the range wraps, and stays
+        valid until the producer laps it, so process it promptly.
+        
+        Args:
+            start: Position of the first sample
+            end: Position after the last sample (defaults to the consumer position)
+            
+        Returns:
+            1-D array of samples
+        """
+        if end is None:
+            end = self._tail
+        
+        oldest = self._head - self.capacity
+        if start < oldest:
+            logger.warning("Audio segment exceeded the ring buffer, dropping %d oldest samples", oldest - start)
+            start = oldest
+        
+        n = end - start
+        if n <= 0:
+            return np.zeros(0, dtype=self._buf.dtype)
+        
+        begin = start % self.capacity
+        if begin + n <= self.capacity:
+            return self._buf[begin:begin + n]
+        return np.concatenate((self._buf[begin:], self._buf[:n - (self.capacity - begin)]))
+    
+    def start_session(self) -> None:
+        """Mark everything written so far as belonging to the previous session.
+        
+        Producer side: call it while nothing is writing, before the stream starts.
+        """
+        self._session_start = self._head
+    
+    def skip_to_session(self) -> None:
+        """Drop unread samples left over from before the current session.
+        
+        Consumer side: call it from the reading thread, like read().
+        """
+        self._tail = max(self._tail, self._session_start)
+
 
 class AudioProcessor:
     """Handles audio capture and processing."""
     
-    def __init__(self, sample_rate: int = 16000, chunk_size: int = 4000, device_id: Optional[int] = None, gain: float = 1.0):
+    # How long a PortAudio device enumeration stays valid, in seconds
+    DEVICE_CACHE_TTL = 5.0
+    
+    def __init__(self, sample_rate: int = 16000, chunk_size: int = 4000, device_id: Optional[int] = None,
+                 gain: float = 1.0, buffer_seconds: int = 60):
         """Initialize the audio processor.
         
         Args:
@@ -153,14 +397,25 @@ class AudioProcessor:
             chunk_size: Number of samples per chunk
             device_id: Audio device ID (None for default)
             gain: Audio gain multiplier (default: 1.0)
+            buffer_seconds: Seconds of audio held by the capture ring buffer
         """
         self.sample_rate = sample_rate
         self.gain = gain
         self.chunk_size = chunk_size
         self.device_id = device_id
-        self.audio_queue = queue.Queue() # Use a queue for real-time chunk processing
+        # Preallocated ring buffer shared by the audio callback and the transcription loop.
+        # It holds raw int16 samples; they become float32 (with gain) only when read out.
+        self.ring_buffer = AudioRingBuffer(sample_rate * buffer_seconds, dtype=np.int16)
         self.is_recording = False
         self.recording_thread = None
+        self._stop_event = threading.Event()  # Set by stop_recording to close the stream
+        
+        # Cached sd.query_devices() result (enumeration is slow on some drivers)
+        self._devices_cache = None
+        self._devices_ts = 0.0
+        # Input devices built from that result, reused until it is re-queried
+        self._input_devices: List[Dict[str, Any]] = []
+        self._input_devices_src = None
         
         # Initialize VADs
         self.silero_vad = None
@@ -198,7 +453,10 @@ class AudioProcessor:
             return
         
         self.is_recording = True
-        self.audio_queue = queue.Queue() # Clear queue on start
+        self._stop_event.clear()
+        # The stream is closed, so the producer side can be reset here; the transcription
+        # thread skips the previous session's unread audio itself
+        self.ring_buffer.start_session()
         
         def record_audio():
             """Record audio in a separate thread."""
@@ -209,14 +467,16 @@ class AudioProcessor:
                     samplerate=self.sample_rate,
                     device=self.device_id,
                     channels=1,
-                    dtype='float32',
+                    dtype='int16',
+                    # One callback per chunk instead of PortAudio's small native blocks:
+                    # the loop consumes whole chunks anyway, so this only cuts GIL churn
+                    blocksize=self.chunk_size,
                     callback=self._audio_callback
                 ):
                     logger.info(f"Audio stream started with device ID: {self.device_id}")
                     
-                    # Keep the stream open while recording
-                    while self.is_recording:
-                        time.sleep(0.1)
+                    # Keep the stream open until stop_recording signals
+                    self._stop_event.wait()
                         
             except Exception as e:
                 logger.error(f"Error recording audio: {e}")
@@ -230,121 +490,65 @@ class AudioProcessor:
         self.recording_thread.start()
     
     def stop_recording(self) -> None:
-        """Stop recording audio."""
+        """Stop recording audio.
+        
+        Captured audio is consumed through the ring buffer by the transcription
+        loop, which transcribes the last utterance on exit, so nothing is returned.
+        """
         if not self.is_recording:
             logger.warning("Not recording")
-            return np.array([])
+            return
         
         self.is_recording = False
+        self._stop_event.set()
+        self.ring_buffer.wake()
         
         # Wait for recording thread to finish
         if self.recording_thread:
             self.recording_thread.join(timeout=1.0)
             self.recording_thread = None
         
-        # No need to return audio, chunks are processed via queue
         logger.info("Audio recording stopped.")
     
     def _audio_callback(self, indata, frames, time, status):
         """Callback for audio stream."""
         if status:
-            logger.warning(f"Audio callback status: {status}")
-        
-        # Apply gain to the audio data
-        amplified_data = indata.copy() * self.gain
-        
-        # Put audio chunk into the queue for processing
-        self.audio_queue.put(amplified_data)
-        
-        # Enhanced speech detection using both VADs if available
-        if self.silero_vad and self.webrtc_vad:
-            # Check if the chunk contains speech using both VADs
-            silero_speech = self.silero_vad.is_speech(indata.squeeze())
-            webrtc_speech = self.webrtc_vad.is_speech(indata.squeeze())
-            
-            # Consider it speech if either VAD detects speech
-            is_speech = silero_speech or webrtc_speech
-            
-            # Log speech detection (debug only)
-            if is_speech:
-                logger.debug(f"Speech detected in audio chunk (Silero: {silero_speech}, WebRTC: {webrtc_speech})")
+            logger.warning("Audio callback status: %s", status)
         
-        # Process audio with single VAD if only one is available
-        elif self.vad:
-            # Check if the chunk contains speech
-            is_speech = self.vad.is_speech(indata.squeeze())
-            
-            # Log speech detection (debug only)
-            if is_speech:
-                logger.debug("Speech detected in audio chunk")
+        # This runs on PortAudio's realtime thread, so it only copies the mono channel
+        # into the ring buffer. Gain, float conversion and speech detection all happen
+        # on the consumer side, in the transcription loop.
+        self.ring_buffer.write(indata[:, 0])
     
-    def filter_audio(self, audio: np.ndarray) -> np.ndarray:
-        """Filter audio using VAD to keep only speech segments.
+    def _devices(self, refresh: bool = False):
+        """Return the PortAudio device list, re-querying at most every DEVICE_CACHE_TTL seconds.
         
         Args:
-            audio: Numpy array of audio samples
-            
-        Returns:
-            Filtered audio with only speech segments
+            refresh: Re-enumerate now regardless of the cache age
         """
-        # Enhanced filtering using both VADs if available
-        if self.silero_vad and self.webrtc_vad:
-            logger.info("Applying enhanced VAD filtering with both Silero and WebRTC")
-            
-            # Get speech segments from both VADs
-            silero_segments = self.silero_vad.get_speech_segments(audio)
-            webrtc_segments = self.webrtc_vad.get_speech_segments(audio)
-            
-            # Merge segments
-            all_segments = silero_segments + webrtc_segments
-            
-            # Sort segments by start time
-            all_segments.sort(key=lambda x: x[0])
-            
-            # Merge overlapping segments
-            merged_segments = []
-            if all_segments:
-                current_start, current_end = all_segments[0]
-                
-                for start, end in all_segments[1:]:
-                    if start <= current_end:
-                        # Segments overlap, merge them
-                        current_end = max(current_end, end)
-                    else:
-                        # Add current segment
-                        merged_segments.append((current_start, current_end))
-                        
-                        # Start new segment
-                        current_start, current_end = start, end
-                
-                # Add the last segment
-                merged_segments.append((current_start, current_end))
-            
-            # Concatenate speech segments
-            if merged_segments:
-                filtered_audio = np.concatenate([audio[start:end] for start, end in merged_segments])
-                return filtered_audio
-            else:
-                logger.info("No speech detected by enhanced VAD")
-                return np.array([])
-        
-        # Use single VAD if only one is available
-        elif self.vad:
-            logger.info(f"Applying VAD filtering with {type(self.vad).__name__}")
-            return self.vad.filter_audio(audio)
-        else:
-            return audio
+        now = time.monotonic()
+        if refresh or self._devices_cache is None or now - self._devices_ts > self.DEVICE_CACHE_TTL:
+            self._devices_cache = sd.query_devices()
+            self._devices_ts = now
+        return self._devices_cache
     
-    def get_audio_devices(self) -> List[Dict[str, str]]:
+    def get_audio_devices(self, refresh: bool = False) -> List[Dict[str, str]]:
         """Get a list of available audio input devices.
         
+        Args:
+            refresh: Bypass the device cache (e.g. after plugging in a microphone)
+        
         Returns:
             List of dictionaries with device information
         """
         devices = []
         
         try:
-            device_list = sd.query_devices()
+            device_list = self._devices(refresh)
+            if device_list is self._input_devices_src:
+                # Same enumeration as last time: skip rebuilding (and re-logging) the list
+                return self._input_devices
+            
             for i, device in enumerate(device_list):
                 if device['max_input_channels'] > 0:
                     devices.append({
@@ -356,11 +560,15 @@ class AudioProcessor:
                     })
                     
                     # Log device info for debugging
-                    logger.info(f"Found audio device: {device['name']} (ID: {i}, Channels: {device['max_input_channels']})")
+                    logger.debug("Found audio device: %s (ID: %d, Channels: %d)",
+                                 device['name'], i, device['max_input_channels'])
                     
                     # Check if this is a Focusrite device
                     if 'focusrite' in device['name'].lower() or 'clarett' in device['name'].lower():
                         logger.info(f"Detected Focusrite audio interface: {device['name']}")
+            
+            self._input_devices_src = device_list
+            self._input_devices = devices
         except Exception as e:
             logger.error(f"Error getting audio devices: {e}")
         
@@ -378,7 +586,7 @@ class AudioProcessor:
         """
         try:
             # Check if device exists
-            devices = sd.query_devices()
+            devices = self._devices()
             if device_id >= len(devices):
                 logger.error(f"Invalid device ID: {device_id}")
                 return False
@@ -399,28 +607,85 @@ class AudioProcessor:
             logger.error(f"Error setting audio device: {e}")
             return False
 
+    def _to_float(self, samples: np.ndarray) -> np.ndarray:
+        """Convert captured int16 samples to gain-scaled float32 in a single pass."""
+        return np.multiply(samples, self.gain / 32768.0, dtype=np.float32)
+    
+    def buffered_samples(self) -> int:
+        """Number of captured samples not yet consumed (a counter check, no copying)."""
+        return self.ring_buffer.available()
+    
     def get_audio_chunk(self, timeout=0.1) -> Optional[np.ndarray]:
-        """Retrieves an audio chunk from the queue.
+        """Retrieves a chunk_size block of samples from the ring buffer.
+
+        Samples are only copied out once a full chunk is buffered, so the
+        consumer doesn't read (and VAD-score) every small callback fragment.
+        When recording stops, whatever is left is returned.
 
         Args:
-            timeout (float): Maximum time to wait for an item in seconds.
+            timeout (float): Maximum time to wait for audio in seconds.
 
         Returns:
-            np.ndarray or None: An audio chunk as a NumPy array, or None if the queue is empty.
+            np.ndarray or None: A 1-D float32 audio chunk, or None if no full chunk arrived in time.
         """
-        try:
-            return self.audio_queue.get(timeout=timeout)
-        except queue.Empty:
+        if self.buffered_samples() < self.chunk_size and not self.ring_buffer.wait(
+                timeout, min_samples=self.chunk_size, stop=lambda: not self.is_recording):
             return None
+        chunk = self.ring_buffer.read(self.chunk_size)
+        return None if chunk is None else self._to_float(chunk)
+    
+    def snapshot(self, start: int) -> np.ndarray:
+        """Return all audio consumed since a ring buffer position.
+        
+        Args:
+            start: Ring buffer position, as returned by ring_buffer.position
+            
+        Returns:
+            1-D float32 audio array
+        """
+        return self._to_float(self.ring_buffer.snapshot(start))
 
     def is_running(self) -> bool:
         """Returns True if audio capture is currently active."""
         return self.is_recording
 
 
+@functools.lru_cache(maxsize=2048)
+def _text_hash(text: str) -> str:
+    """md5 hex digest of text, memoized since the same phrases and queries recur."""
+    return hashlib.md5(text.encode('utf-8')).hexdigest()
+
+
 class TranscriptionCache:
     """Enhanced caching system for transcriptions with smarter phrase matching and optimization."""
     
+    # Fingerprint features compared for audio similarity, in fingerprint matrix column order
+    FINGERPRINT_FIELDS = ('length', 'mean', 'std', 'energy', 'peak_freq')
+    
+    # Common programming phrases and voice commands every cache starts with
+    COMMON_PHRASES = (
+        # Common programming phrases
+        "import numpy as np",
+        "import torch",
+        "import tensorflow as tf",
+        "def __init__(self):",
+        "return result",
+        "if __name__ == '__main__':",
+        # Common voice commands
+        "new function",
+        "new class",
+        "create variable",
+        "add comment",
+        "delete line",
+        "save file",
+        "run program",
+        "stop program",
+        "import library",
+    )
+    
+    # Their text hashes (as _hash_text computes them), hashed once at import
+    _COMMON_PHRASE_HASHES = {_text_hash(phrase): phrase for phrase in COMMON_PHRASES}
+    
     def __init__(self, max_size: int = 200, similarity_threshold: float = 0.85, 
                  persistent_path: Optional[str] = None):
         """Initialize the transcription cache with smart features.
@@ -430,15 +695,13 @@ class TranscriptionCache:
             similarity_threshold: Threshold for text similarity matching (0.0-1.0)
             persistent_path: File path for persistent cache storage (None for in-memory only)
         """
-        # Main cache using OrderedDict to track usage order
-        self.cache = OrderedDict()
+        # Main cache using OrderedDict to track usage order. Each entry holds the text and
+        # the audio fingerprint together, so one pop evicts both
+        self.cache: OrderedDict[str, Tuple[str, Dict[str, float]]] = OrderedDict()
         
         # Phrase-based cache for common phrases
         self.phrase_cache = {}
         
-        # Audio fingerprint cache for similar audio
-        self.audio_fingerprint_cache = {}
-        
         # Keep track of common phrases for optimization
         self.phrase_frequency = {}
         
@@ -458,37 +721,22 @@ class TranscriptionCache:
         # Load persistent cache if available
         if persistent_path and os.path.exists(persistent_path):
             self._load_persistent_cache()
+        
+        # Fingerprints as rows of one matrix, so a lookup scores every entry at once
+        self._rebuild_fingerprint_index()
+        
+        # (hash, fingerprint) of the last missed lookup: transcribe() stores the same
+        # audio right after, and set() reuses the fingerprint instead of recomputing it
+        self._last_miss: Optional[Tuple[str, Dict[str, float]]] = None
             
         # Create context-based common phrases
         self._initialize_common_phrases()
     
     def _initialize_common_phrases(self):
         """Initialize cache with common programming and voice command phrases."""
-        common_phrases = [
-            # Common programming phrases
-            "import numpy as np",
-            "import torch",
-            "import tensorflow as tf",
-            "def __init__(self):",
-            "return result",
-            "if __name__ == '__main__':",
-            # Common voice commands
-            "new function",
-            "new class",
-            "create variable",
-            "add comment",
-            "delete line",
-            "save file",
-            "run program",
-            "stop program",
-            "import library"
-        ]
-        
-        for phrase in common_phrases:
-            # Add to phrase cache with empty audio fingerprint
-            phrase_hash = self._hash_text(phrase)
-            self.phrase_cache[phrase_hash] = phrase
-            self.phrase_frequency[phrase_hash] = 1
+        # Add to phrase cache with empty audio fingerprint
+        self.phrase_cache.update(self._COMMON_PHRASE_HASHES)
+        self.phrase_frequency.update(dict.fromkeys(self._COMMON_PHRASE_HASHES, 1))
     
     def _hash_text(self, text: str) -> str:
         """Create a hash from text for efficient lookup.
@@ -499,10 +747,13 @@ class TranscriptionCache:
         Returns:
             Hash string
         """
-        return hashlib.md5(text.encode('utf-8')).hexdigest()
+        return _text_hash(text)
     
-    def _hash_audio(self, audio: np.ndarray) -> str:
-        """Create a hash from audio data for efficient lookup.
+    def _hash_samples(self, audio: np.ndarray) -> str:
+        """Hash the exact audio samples for the main cache.
+        
+        Uses AUDIO_HASH: xxh3 when xxhash is installed, md5 otherwise. Both read the
+        array through the buffer protocol, so there is no tobytes() copy.
         
         Args:
             audio: Audio data
@@ -510,14 +761,10 @@ class TranscriptionCache:
         Returns:
             Hash string
         """
-        # Use downsample to create a more general fingerprint
-        # This allows similar audio inputs to match
-        if len(audio) > 1600:  # Ensure audio is long enough
-            downsampled = audio[::10]  # Take every 10th sample
-            # Round values to reduce precision for better matching
-            rounded = np.round(downsampled * 10) / 10
-            return hashlib.md5(rounded.tobytes()).hexdigest()
-        return hashlib.md5(audio.tobytes()).hexdigest()
+        audio = np.ascontiguousarray(audio)
+        if xxhash is not None:
+            return xxhash.xxh3_64_hexdigest(audio)
+        return hashlib.md5(audio).hexdigest()
     
     def _compute_audio_fingerprint(self, audio: np.ndarray) -> Dict[str, float]:
         """Compute audio fingerprint features for similarity detection.
@@ -531,28 +778,32 @@ class TranscriptionCache:
         if len(audio) == 0:
             return {}
             
-        # Extract basic audio features
+        # Extract basic audio features. Mean and std are derived from the sum and the
+        # energy (sum of squares); np.std alone makes two passes and a temporary array
+        n = len(audio)
+        mean = float(audio.sum()) / n
+        energy = float(np.dot(audio, audio))
         features = {
-            'length': len(audio),
-            'mean': float(np.mean(audio)),
-            'std': float(np.std(audio)),
-            'max': float(np.max(audio)),
-            'min': float(np.min(audio)),
-            'energy': float(np.sum(audio**2)),
+            'length': n,
+            'mean': mean,
+            'std': max(0.0, energy / n - mean * mean) ** 0.5,
+            'max': float(audio.max()),
+            'min': float(audio.min()),
+            'energy': energy,
             # More advanced features could be added here
         }
         
         # Add spectral features if audio is long enough
-        if len(audio) > 1600:
-            # Compute frequency features
-            try:
-                from scipy import signal
-                frequencies, power = signal.periodogram(audio, fs=16000)
-                features['peak_freq'] = float(frequencies[np.argmax(power)])
-                features['spectral_centroid'] = float(np.sum(frequencies * power) / np.sum(power) if np.sum(power) > 0 else 0)
-            except ImportError:
-                # Skip spectral features if scipy not available
-                pass
+        if n > 1600:
+            # Compute frequency features from the one-sided power spectrum of the
+            # mean-removed audio, as signal.periodogram does, but with a single rfft and
+            # without its density scaling, which neither feature depends on
+            spectrum = np.fft.rfft(audio - mean)
+            power = spectrum.real ** 2 + spectrum.imag ** 2
+            frequencies = np.fft.rfftfreq(n, d=1 / 16000)
+            total_power = float(power.sum())
+            features['peak_freq'] = float(frequencies[np.argmax(power)])
+            features['spectral_centroid'] = float(np.dot(frequencies, power)) / total_power if total_power > 0 else 0.0
                 
         return features
     
@@ -569,49 +820,93 @@ class TranscriptionCache:
         # Use SequenceMatcher for better string comparison
         return SequenceMatcher(None, text1.lower(), text2.lower()).ratio()
     
-    def _calculate_audio_similarity(self, features1: Dict[str, float], features2: Dict[str, float]) -> float:
-        """Calculate similarity between two audio fingerprints.
+    def _calculate_audio_similarities(self, features: Dict[str, float]) -> np.ndarray:
+        """Calculate the similarity of an audio fingerprint to every stored fingerprint.
         
         Args:
-            features1: First audio features
-            features2: Second audio features
+            features: Audio features of the query
             
         Returns:
-            Similarity score (0.0-1.0)
+            Similarity scores (0.0-1.0), one per row of the fingerprint matrix
         """
-        if not features1 or not features2:
-            return 0.0
-            
+        length, mean, std, energy, peak_freq = self._fingerprint_vector(features)
+        stored = self._fp_matrix[:len(self._fp_keys)]
+        lengths, means, stds, energies, peak_freqs = stored.T
+        
         # Calculate similarity based on features
-        try:
-            length_similarity = min(features1['length'], features2['length']) / max(features1['length'], features2['length'])
-            mean_similarity = 1.0 - min(1.0, abs(features1['mean'] - features2['mean']) / max(0.01, max(abs(features1['mean']), abs(features2['mean']))))
-            std_similarity = 1.0 - min(1.0, abs(features1['std'] - features2['std']) / max(0.01, max(features1['std'], features2['std'])))
-            energy_similarity = min(features1['energy'], features2['energy']) / max(0.01, max(features1['energy'], features2['energy']))
-            
-            # Weighted combination
-            similarity = (length_similarity * 0.1 + 
-                         mean_similarity * 0.3 + 
-                         std_similarity * 0.3 + 
-                         energy_similarity * 0.3)
-                         
-            # Include spectral features if available
-            if 'peak_freq' in features1 and 'peak_freq' in features2:
-                peak_freq_similarity = 1.0 - min(1.0, abs(features1['peak_freq'] - features2['peak_freq']) / max(1.0, max(features1['peak_freq'], features2['peak_freq'])))
-                similarity = similarity * 0.8 + peak_freq_similarity * 0.2
-                
-            return min(1.0, max(0.0, similarity))
-        except (KeyError, ZeroDivisionError):
-            return 0.0
+        length_similarity = np.minimum(length, lengths) / np.maximum(length, lengths)
+        mean_similarity = 1.0 - np.minimum(1.0, np.abs(mean - means) / np.maximum(0.01, np.maximum(abs(mean), np.abs(means))))
+        std_similarity = 1.0 - np.minimum(1.0, np.abs(std - stds) / np.maximum(0.01, np.maximum(std, stds)))
+        energy_similarity = np.minimum(energy, energies) / np.maximum(0.01, np.maximum(energy, energies))
+        
+        # Weighted combination
+        similarity = (length_similarity * 0.1 +
+                      mean_similarity * 0.3 +
+                      std_similarity * 0.3 +
+                      energy_similarity * 0.3)
+        
+        # Include spectral features where both fingerprints have them (NaN marks a missing one)
+        peak_freq_similarity = 1.0 - np.minimum(1.0, np.abs(peak_freq - peak_freqs) / np.maximum(1.0, np.maximum(peak_freq, peak_freqs)))
+        similarity = np.where(np.isnan(peak_freq_similarity), similarity, similarity * 0.8 + peak_freq_similarity * 0.2)
+        
+        return np.clip(similarity, 0.0, 1.0)
+    
+    def _fingerprint_vector(self, features: Dict[str, float]) -> List[float]:
+        """Lay out a fingerprint's features in FINGERPRINT_FIELDS order, NaN for missing ones."""
+        return [features.get(field, np.nan) for field in self.FINGERPRINT_FIELDS]
+    
+    def _rebuild_fingerprint_index(self) -> None:
+        """Rebuild the fingerprint matrix from the cached entries."""
+        self._fp_keys: List[str] = []
+        self._fp_rows: Dict[str, int] = {}
+        self._fp_matrix = np.empty((self.max_size + 1, len(self.FINGERPRINT_FIELDS)))
+        for audio_hash, (_, features) in self.cache.items():
+            self._index_fingerprint(audio_hash, features)
+    
+    def _index_fingerprint(self, audio_hash: str, features: Dict[str, float]) -> None:
+        """Add or update a fingerprint's row in the fingerprint matrix."""
+        if not features:
+            # Empty audio has no fingerprint to match against
+            self._unindex_fingerprint(audio_hash)
+            return
+        
+        row = self._fp_rows.get(audio_hash)
+        if row is None:
+            row = len(self._fp_keys)
+            if row == len(self._fp_matrix):
+                self._fp_matrix = np.concatenate((self._fp_matrix, np.empty_like(self._fp_matrix)))
+            self._fp_keys.append(audio_hash)
+            self._fp_rows[audio_hash] = row
+        self._fp_matrix[row] = self._fingerprint_vector(features)
+    
+    def _unindex_fingerprint(self, audio_hash: str) -> None:
+        """Remove a fingerprint's row, moving the last row into its place."""
+        row = self._fp_rows.pop(audio_hash, None)
+        if row is None:
+            return
+        
+        last_hash = self._fp_keys.pop()
+        if last_hash != audio_hash:
+            self._fp_keys[row] = last_hash
+            self._fp_rows[last_hash] = row
+            self._fp_matrix[row] = self._fp_matrix[len(self._fp_keys)]
     
     def _load_persistent_cache(self):
         """Load cache from disk."""
         try:
+            # Plain JSON rather than pickle: smaller, faster, and loading it can't run code
             with open(self.persistent_path, 'rb') as f:
-                data = pickle.load(f)
-                self.cache = data.get('cache', OrderedDict())
+                data = orjson.loads(f.read()) if orjson else json.load(f)
+                # [hash, text, fingerprint] entries in LRU order, dropped when they were
+                # hashed with a different algorithm than this process uses
+                if data.get('audio_hash') == AUDIO_HASH:
+                    self.cache = OrderedDict(
+                        (audio_hash, (text, features)) for audio_hash, text, features in data.get('cache', [])
+                    )
+                else:
+                    logger.info(f"Dropping cached audio hashed with {data.get('audio_hash', 'an unknown algorithm')}, "
+                                f"this process uses {AUDIO_HASH}")
                 self.phrase_cache = data.get('phrase_cache', {})
-                self.audio_fingerprint_cache = data.get('audio_fingerprint_cache', {})
                 self.phrase_frequency = data.get('phrase_frequency', {})
                 self.cache_hits = data.get('cache_hits', 0)
                 self.phrase_hits = data.get('phrase_hits', 0)
@@ -624,7 +919,6 @@ class TranscriptionCache:
             # Reset caches
             self.cache = OrderedDict()
             self.phrase_cache = {}
-            self.audio_fingerprint_cache = {}
     
     def _save_persistent_cache(self):
         """Save cache to disk."""
@@ -637,9 +931,9 @@ class TranscriptionCache:
             
             # Prepare data to save
             data = {
-                'cache': self.cache,
+                'audio_hash': AUDIO_HASH,
+                'cache': [[audio_hash, text, features] for audio_hash, (text, features) in self.cache.items()],
                 'phrase_cache': self.phrase_cache,
-                'audio_fingerprint_cache': self.audio_fingerprint_cache,
                 'phrase_frequency': self.phrase_frequency,
                 'cache_hits': self.cache_hits,
                 'phrase_hits': self.phrase_hits,
@@ -650,8 +944,9 @@ class TranscriptionCache:
             }
             
             # Save to file
+            payload = orjson.dumps(data) if orjson is not None else json.dumps(data).encode('utf-8')
             with open(self.persistent_path, 'wb') as f:
-                pickle.dump(data, f)
+                f.write(payload)
                 
             logger.info(f"Saved cache with {len(self.cache)} entries to {self.persistent_path}")
             
@@ -670,13 +965,16 @@ class TranscriptionCache:
         self.total_lookups += 1
         
         # Try exact audio match first (fastest)
-        audio_hash = hashlib.md5(audio.tobytes()).hexdigest()
-        if audio_hash in self.cache:
+        audio_hash = self._hash_samples(audio)
+        try:
+            text, _ = self.cache[audio_hash]
+        except KeyError:
+            pass
+        else:
             self.cache_hits += 1
             self.hit_ratio = (self.cache_hits + self.phrase_hits + self.similarity_hits + self.audio_hits) / self.total_lookups
             
             # Move to end of OrderedDict to mark as recently used
-            text = self.cache[audio_hash]
             self.cache.move_to_end(audio_hash)
             
             logger.info(f"Exact cache hit (total hits: {self.cache_hits}, ratio: {self.hit_ratio:.2f})")
@@ -684,17 +982,20 @@ class TranscriptionCache:
         
         # Compute audio fingerprint for similarity matching
         audio_fingerprint = self._compute_audio_fingerprint(audio)
+        self._last_miss = (audio_hash, audio_fingerprint)
         
-        # Try similarity-based matching
-        for stored_hash, features in self.audio_fingerprint_cache.items():
-            similarity = self._calculate_audio_similarity(audio_fingerprint, features)
+        # Try similarity-based matching, scoring all stored fingerprints in one pass
+        if audio_fingerprint and self._fp_keys:
+            similarities = self._calculate_audio_similarities(audio_fingerprint)
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
             
             if similarity >= self.similarity_threshold:
                 self.audio_hits += 1
                 self.hit_ratio = (self.cache_hits + self.phrase_hits + self.similarity_hits + self.audio_hits) / self.total_lookups
                 
                 logger.info(f"Audio similarity cache hit (similarity: {similarity:.2f}, hits: {self.audio_hits}, ratio: {self.hit_ratio:.2f})")
-                return self.cache[stored_hash]
+                return self.cache[self._fp_keys[best]][0]
         
         return None
     
@@ -715,11 +1016,22 @@ class TranscriptionCache:
             return self.phrase_cache[text_hash]
         
         # Try similarity-based text matching
-        if self.cache:
+        if self.cache and fuzz is not None:
+            # Best match over all cached texts in one native call (scores are 0-100)
+            match = fuzz_process.extractOne(
+                text, [cached_text for cached_text, _ in self.cache.values()],
+                scorer=fuzz.ratio, processor=str.lower,
+                score_cutoff=self.similarity_threshold * 100
+            )
+            if match:
+                self.similarity_hits += 1
+                logger.info(f"Text similarity cache hit (similarity: {match[1] / 100:.2f}, hits: {self.similarity_hits})")
+                return match[0]
+        elif self.cache:
             best_match = None
             best_similarity = 0.0
             
-            for audio_hash, cached_text in self.cache.items():
+            for cached_text, _ in self.cache.values():
                 similarity = self._calculate_text_similarity(text, cached_text)
                 
                 if similarity > best_similarity and similarity >= self.similarity_threshold:
@@ -740,12 +1052,20 @@ class TranscriptionCache:
             audio: Audio array
             text: Transcribed text
         """
-        # Store in main cache
-        audio_hash = hashlib.md5(audio.tobytes()).hexdigest()
-        self.cache[audio_hash] = text
+        audio_hash = self._hash_samples(audio)
+        
+        # Fingerprint the audio, reusing the one get() just computed for it
+        if self._last_miss is not None and self._last_miss[0] == audio_hash:
+            features = self._last_miss[1]
+        else:
+            features = self._compute_audio_fingerprint(audio)
+        self._last_miss = None
         
-        # Store audio fingerprint
-        self.audio_fingerprint_cache[audio_hash] = self._compute_audio_fingerprint(audio)
+        # Store text and fingerprint together in the main cache
+        self.cache[audio_hash] = (text, features)
+        # Re-setting an existing key must also refresh its LRU position
+        self.cache.move_to_end(audio_hash)
+        self._index_fingerprint(audio_hash, features)
         
         # Update phrase frequency
         text_hash = self._hash_text(text)
@@ -768,21 +1088,25 @@ class TranscriptionCache:
         while len(self.cache) > self.max_size:
             # Remove oldest item (first item in OrderedDict)
             audio_hash, _ = self.cache.popitem(last=False)
-            
-            # Also remove from fingerprint cache
-            if audio_hash in self.audio_fingerprint_cache:
-                del self.audio_fingerprint_cache[audio_hash]
+            self._unindex_fingerprint(audio_hash)
                 
         # Limit phrase cache to most frequent items
         if len(self.phrase_cache) > self.max_size / 2:
-            # Sort phrases by frequency
-            sorted_phrases = sorted(self.phrase_frequency.items(), key=lambda x: x[1], reverse=True)
-            
-            # Keep only the top half
-            keep_phrases = set(item[0] for item in sorted_phrases[:int(self.max_size / 2)])
-            
-            # Filter phrase cache
-            self.phrase_cache = {k: v for k, v in self.phrase_cache.items() if k in keep_phrases}
+            # Keep only the top half by frequency; a bounded heap avoids sorting every count
+            top_phrases = heapq.nlargest(int(self.max_size / 2), self.phrase_frequency.items(),
+                                         key=itemgetter(1))
+            keep_phrases = {k for k, _ in top_phrases}
+            
+            # Filter phrase cache in place
+            for k in [k for k in self.phrase_cache if k not in keep_phrases]:
+                del self.phrase_cache[k]
+        
+        # Phrase counts gain an entry for every distinct transcription, so without a cap they
+        # (and the persisted cache) grow for as long as the app runs; trim to the most
+        # frequent half once they pass ten times the cache size
+        if len(self.phrase_frequency) > self.max_size * 10:
+            self.phrase_frequency = dict(heapq.nlargest(self.max_size * 5, self.phrase_frequency.items(),
+                                                        key=itemgetter(1)))
     
     def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics.
@@ -793,7 +1117,7 @@ class TranscriptionCache:
         return {
             'size': len(self.cache),
             'phrase_cache_size': len(self.phrase_cache),
-            'fingerprint_cache_size': len(self.audio_fingerprint_cache),
+            'fingerprint_cache_size': len(self._fp_keys),
             'cache_hits': self.cache_hits,
             'phrase_hits': self.phrase_hits,
             'similarity_hits': self.similarity_hits,
@@ -807,7 +1131,7 @@ class TranscriptionCache:
     def clear(self) -> None:
         """Clear the cache."""
         self.cache.clear()
-        self.audio_fingerprint_cache.clear()
+        self._rebuild_fingerprint_index()
         # Keep phrase cache for common phrases
         self.total_lookups = 0
         self.cache_hits = 0
@@ -817,25 +1141,221 @@ class TranscriptionCache:
         self.hit_ratio = 0.0
 
 
+class GPUFeatureExtractor:
+    """Drop-in replacement for faster-whisper's FeatureExtractor that runs on the GPU.
+    
+    faster-whisper computes the log-mel spectrogram with numpy on the CPU for
+    every transcribe() call. This wrapper keeps the mel filterbank and Hann
+    window resident on the device and runs the STFT and mel projection there,
+    returning the same numpy features the CTranslate2 encoder expects. Any
+    attribute it does not define is read from the wrapped extractor.
+    """
+    
+    def __init__(self, base, device: str = "cuda"):
+        """Initialize the extractor.
+        
+        Args:
+            base: The model's original faster_whisper FeatureExtractor
+            device: Torch device to compute features on
+        """
+        import torch
+        
+        self._base = base
+        self.device = device
+        self.mel_filters = torch.from_numpy(np.asarray(base.mel_filters, dtype=np.float32)).to(device)
+        self.hann = torch.hann_window(base.n_fft, device=device)
+        
+        # Page-locked staging buffer and a dedicated stream for async host-to-device uploads
+        self.pinned = torch.empty(base.n_samples, dtype=torch.float32, pin_memory=True)
+        self.stream = torch.cuda.Stream(device=device)
+        
+        # Persistent device buffer for the padded waveform, sized for up to 30 s of
+        # audio plus a full 30 s of padding so typical calls never allocate on the device
+        self.padded = torch.zeros(2 * base.n_samples, dtype=torch.float32, device=device)
+        
+        # The buffers above were filled on the default stream but are used on self.stream
+        self.stream.wait_stream(torch.cuda.current_stream())
+    
+    def __getattr__(self, name):
+        return getattr(self._base, name)
+    
+    def __call__(self, waveform: np.ndarray, padding=160, chunk_length=None, **kwargs) -> np.ndarray:
+        """Compute the log-mel spectrogram of a waveform.
+        
+        Args:
+            waveform: Numpy array of audio samples
+            padding: Zero samples to append (True pads a full chunk, as in older faster-whisper)
+            chunk_length: Optional chunk length in seconds
+            
+        Returns:
+            Log-mel spectrogram as a numpy array
+        """
+        import torch
+        
+        base = self._base
+        if chunk_length is not None:
+            base.n_samples = chunk_length * base.sampling_rate
+            base.nb_max_frames = base.n_samples // base.hop_length
+        
+        try:
+            pad = base.n_samples if padding is True else int(padding or 0)
+            
+            # Stage the samples in pinned memory, growing it for unusually long audio
+            n = len(waveform)
+            if n > self.pinned.numel():
+                self.pinned = torch.empty(n, dtype=torch.float32, pin_memory=True)
+            host = self.pinned[:n]
+            host.copy_(torch.from_numpy(np.ascontiguousarray(waveform, dtype=np.float32)))
+            
+            if n + pad > self.padded.numel():
+                self.padded = torch.zeros(n + pad, dtype=torch.float32, device=self.device)
+                self.stream.wait_stream(torch.cuda.current_stream())
+            
+            with torch.cuda.stream(self.stream):
+                audio = self.padded[:n + pad]
+                audio[:n].copy_(host, non_blocking=True)
+                audio[n:].zero_()
+                
+                stft = torch.stft(audio, base.n_fft, base.hop_length, window=self.hann, return_complex=True)
+                # Power spectrum straight from re^2 + im^2, without |z| taking a sqrt that ** 2 undoes
+                magnitudes = torch.view_as_real(stft[..., :-1]).square().sum(-1)
+                mel_spec = self.mel_filters @ magnitudes
+                
+                log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+                log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+                log_spec = (log_spec + 4.0) / 4.0
+                
+                # Copying back synchronizes the stream, so the pinned buffer is free for the next call
+                return log_spec.cpu().numpy()
+        except Exception as e:
+            logger.warning(f"GPU feature extraction failed, falling back to CPU: {e}")
+            return base(waveform, padding=padding, chunk_length=chunk_length, **kwargs)
+
+
+class WhisperCppModel:
+    """whisper.cpp model behind faster-whisper's transcribe() interface.
+    
+    ggml models need about half the resident memory of CTranslate2 ones on CPU and
+    can be 4/5-bit quantized, which suits low-RAM machines. Decoding options that
+    whisper.cpp has no equivalent for are ignored.
+    """
+    
+    # ggml's published model names differ from faster-whisper's for a few sizes
+    # (large-v3-turbo is published under the same name)
+    MODEL_NAMES = {"large": "large-v3"}
+    
+    def __init__(self, model_size: str, models_dir: str, quantization: Optional[str] = None,
+                 n_threads: int = 0):
+        """Load a ggml model, downloading it into models_dir if needed.
+        
+        Args:
+            model_size: Whisper model size
+            models_dir: Directory holding ggml-<name>.bin files
+            quantization: ggml quantization suffix ("q5_0", "q4_0", ...), or None for float16
+            n_threads: whisper.cpp threads (0 uses one per physical core)
+        """
+        if GGMLModel is None:
+            raise RuntimeError("pywhispercpp is not installed")
+        
+        name = self.MODEL_NAMES.get(model_size, model_size)
+        if quantization:
+            name = f"{name}-{quantization}"
+        
+        # Locally quantized files (e.g. q4_0, which isn't published) are used as-is;
+        # published names are downloaded by pywhispercpp on first use
+        path = os.path.join(models_dir, f"ggml-{name}.bin")
+        if not os.path.isfile(path) and model_size.startswith("distil-"):
+            # Distilled checkpoints have no published ggml build for pywhispercpp to fetch
+            raise ValueError(f"No whisper.cpp model is published for {model_size}; "
+                             f"put a converted ggml-{name}.bin in {models_dir} or use the faster-whisper backend")
+        self.model = GGMLModel(
+            path if os.path.isfile(path) else name,
+            models_dir=models_dir,
+            n_threads=n_threads or PHYSICAL_CORES,
+            print_progress=False,
+            print_realtime=False
+        )
+    
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None,
+                   initial_prompt: Optional[str] = None, **_options):
+        """Transcribe 16 kHz mono float32 audio.
+        
+        Returns:
+            (segments, info) like faster-whisper; info is always None
+        """
+        params = {}
+        if language:
+            params["language"] = language
+        if initial_prompt:
+            params["initial_prompt"] = initial_prompt
+        return iter(self.model.transcribe(audio, **params)), None
+
+
 class WhisperTranscriber:
     """Handles transcription using Whisper with optimized GPU acceleration."""
     
     # Model size options
-    MODEL_SIZES = ["tiny", "base", "small", "medium", "large"]
+    MODEL_SIZES = [
+        "tiny", "base", "small", "medium", "large",
+        # Distilled / turbo checkpoints: several times faster at similar English accuracy
+        "distil-small.en", "distil-medium.en", "distil-large-v3", "large-v3-turbo",
+    ]
+    
+    # Hugging Face Transformers checkpoint behind each size, for converting it to int8 on
+    # disk. Not simply openai/whisper-<size>: faster-whisper's "large" is large-v3, and
+    # the distilled checkpoints are published by distil-whisper
+    TRANSFORMERS_CHECKPOINTS = {
+        "tiny": "openai/whisper-tiny",
+        "base": "openai/whisper-base",
+        "small": "openai/whisper-small",
+        "medium": "openai/whisper-medium",
+        "large": "openai/whisper-large-v3",
+        "distil-small.en": "distil-whisper/distil-small.en",
+        "distil-medium.en": "distil-whisper/distil-medium.en",
+        "distil-large-v3": "distil-whisper/distil-large-v3",
+        "large-v3-turbo": "openai/whisper-large-v3-turbo",
+    }
+    
+    # Decoding for partial results (pieces of an utterance still being dictated): greedy,
+    # no temperature fallback, no timestamp tokens and no conditioning on earlier text
+    PARTIAL_DECODE_OPTIONS = {
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": 0.0,
+        "without_timestamps": True,
+        "condition_on_previous_text": False,
+    }
+    
+    # Inference backends: CTranslate2 (GPU capable) or whisper.cpp (CPU only, lower memory)
+    BACKENDS = ["faster-whisper", "whisper.cpp"]
     
-    def __init__(self, model_size: str = "base", device: str = "auto", compute_type: str = "auto"):
+    # ggml weight quantizations usable as the compute type with the whisper.cpp backend
+    GGML_QUANT_TYPES = ["q4_0", "q5_0", "q5_1", "q8_0"]
+    
+    def __init__(self, model_size: str = "base", device: str = "auto", compute_type: str = "auto",
+                 cpu_threads: int = 0, backend: str = "faster-whisper", offline: bool = False):
         """Initialize the transcriber with optimized settings.
         
         Args:
             model_size: Whisper model size
             device: Device to run the model on ("cpu", "cuda", or "auto")
             compute_type: Compute type ("int8", "float16", "float32", or "auto")
+            cpu_threads: CTranslate2 CPU threads (0 uses one per physical core)
+            backend: Inference backend, one of BACKENDS
+            offline: Never download the model; loading fails if it is not on disk
         """
         if model_size not in self.MODEL_SIZES:
             logger.warning(f"Invalid model size: {model_size}. Using 'base' instead.")
             model_size = "base"
         
         self.model_size = model_size
+        self.cpu_threads = cpu_threads or PHYSICAL_CORES
+        self.backend = backend
+        self.offline = offline
+        
+        # pywhispercpp wheels are CPU builds
+        if backend == "whisper.cpp":
+            device = "cpu"
         
         # Determine device with better GPU detection
         if device == "auto":
@@ -862,31 +1382,29 @@ class WhisperTranscriber:
         else:
             self.device = device
         
-        # Optimize compute type based on device and available memory
-        if compute_type == "auto":
+        # Pick the fastest compute type the device supports
+        if backend == "whisper.cpp":
+            # Quantization is a property of the ggml file; unquantized ones are float16
+            self.compute_type = compute_type if compute_type in self.GGML_QUANT_TYPES else "float16"
+        elif compute_type == "auto":
             if self.device == "cuda":
-                try:
-                    import torch
-                    gpu_memory = torch.cuda.get_device_properties(0).total_memory / (1024**3)
-                    
-                    # Use float16 for better performance on most GPUs
-                    if gpu_memory >= 4.0 or self.model_size in ["tiny", "base", "small"]:
-                        self.compute_type = "float16"  # Faster on GPU
-                    else:
-                        # For very limited memory, use int8
-                        self.compute_type = "int8"
-                except:
-                    self.compute_type = "float16"  # Default for GPU
+                # CTranslate2 resolves "auto" to the fastest type the GPU and driver
+                # support (int8_float16 on tensor-core GPUs), so there is nothing to probe
+                self.compute_type = "auto"
             else:
-                self.compute_type = "int8"  # Better for CPU
+                # int8 only beats float32 on CPUs with VNNI dot products; keep it
+                # when the flags can't be read (non-Linux, non-x86)
+                self.compute_type = "float32" if _cpu_has_vnni() is False else "int8"
+                logger.info(f"Using {self.compute_type} on CPU")
         else:
             self.compute_type = compute_type
         
         self.model = None
+        self.load_error = None  # Why _load_model left model as None
         
         # Initialize enhanced transcription cache with persistent storage
         cache_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache")
-        cache_file = os.path.join(cache_dir, f"transcription_cache_{model_size}.pkl")
+        cache_file = os.path.join(cache_dir, f"transcription_cache_{model_size}.json")
         self.cache = TranscriptionCache(
             max_size=500,  # Larger cache size for better performance
             similarity_threshold=0.85,
@@ -898,12 +1416,23 @@ class WhisperTranscriber:
         self.total_transcription_time = 0
         self.transcription_count = 0
         
+        # Single worker that serializes model access across the transcription
+        # loop, the command thread and the wake word path
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+        
         # Load the model
         self._load_model()
+        
+        # The device never changes after loading, so pick the beam size once
+        self.beam_size = self._default_beam_size()
+        
+        # Warm the model in the background so the user's first utterance
+        # doesn't pay for kernel selection and allocator setup
+        self._executor.submit(self.warmup)
     
     def _load_model(self) -> None:
         """Load the Whisper model with optimized settings."""
-        logger.info(f"Loading Whisper model: {self.model_size} on {self.device} with {self.compute_type}")
+        logger.info(f"Loading Whisper model: {self.model_size} on {self.device} with {self.compute_type} ({self.backend})")
         
         try:
             # Check if models directory exists
@@ -911,15 +1440,51 @@ class WhisperTranscriber:
             if not os.path.exists(models_dir):
                 os.makedirs(models_dir)
             
+            if self.backend == "whisper.cpp":
+                quantization = self.compute_type if self.compute_type in self.GGML_QUANT_TYPES else None
+                self.model = WhisperCppModel(self.model_size, models_dir, quantization, n_threads=self.cpu_threads)
+                logger.info("whisper.cpp model loaded successfully")
+                return
+            
+            # The hub models are float16, and CTranslate2 re-quantizes them on every load.
+            # On CPU, use weights already quantized to int8 on disk if they exist. Converting
+            # once (needs transformers and torch, and takes a minute or so) with
+            #   ct2-transformers-converter --model <checkpoint> --quantization int8
+            #     --output_dir models/int8/<size> --copy_files tokenizer.json preprocessor_config.json
+            # where <checkpoint> is TRANSFORMERS_CHECKPOINTS[<size>], makes later loads skip that step
+            model_path = self.model_size
+            if self.device == "cpu" and self.compute_type.startswith("int8"):
+                quantized_dir = os.path.join(models_dir, "int8", self.model_size)
+                if os.path.exists(os.path.join(quantized_dir, "model.bin")):
+                    model_path = quantized_dir
+                    logger.info(f"Using pre-quantized int8 model from {quantized_dir}")
+            
             # Load the model with optimized settings
-            self.model = WhisperModel(
-                model_size_or_path=self.model_size,
+            model_kwargs = dict(
                 device=self.device,
                 compute_type=self.compute_type,
                 download_root=models_dir,
-                cpu_threads=8,  # Optimize CPU threading
-                num_workers=2   # Optimize data loading
+                cpu_threads=self.cpu_threads,
+                num_workers=1   # Calls are serialized on the transcriber's executor
             )
+            try:
+                # Use the downloaded copy without asking the Hugging Face hub for
+                # updates, which costs a network round trip (or a timeout offline)
+                self.model = WhisperModel(model_path, local_files_only=True, **model_kwargs)
+            except LocalEntryNotFoundError:
+                # Not downloaded yet: fetch it once, later loads are local. Any other
+                # failure (out of memory, corrupt weights, ...) is not fixed by downloading
+                if self.offline:
+                    raise RuntimeError(
+                        f"The {self.model_size} model is not downloaded and offline mode is on. Download it with "
+                        f"`python scripts/download_models.py --whisper-models {self.model_size}` or turn offline mode off"
+                    ) from None
+                logger.info(f"Model {self.model_size} not found in {models_dir}, downloading")
+                self.model = WhisperModel(self.model_size, **model_kwargs)
+            
+            # Record what "auto" resolved to, so logs and status show the real type
+            self.compute_type = getattr(self.model.model, "compute_type", self.compute_type)
+            logger.info(f"Effective compute type: {self.compute_type}")
             
             # Optimize CUDA settings if using GPU
             if self.device == "cuda":
@@ -933,21 +1498,73 @@ class WhisperTranscriber:
                     logger.info(f"Using GPU: {torch.cuda.get_device_name(0)}")
                     logger.info(f"CUDA version: {torch.version.cuda}")
                     logger.info(f"GPU memory: {torch.cuda.get_device_properties(0).total_memory / (1024**3):.2f} GB")
-                except:
-                    logger.warning("Failed to set CUDA optimization flags")
+                except Exception as e:
+                    logger.warning(f"Failed to set CUDA optimization flags: {e}")
+                
+                try:
+                    # Compute log-mel features on the GPU instead of numpy on the CPU
+                    self.model.feature_extractor = GPUFeatureExtractor(self.model.feature_extractor, device="cuda")
+                except Exception as e:
+                    logger.warning(f"GPU feature extraction unavailable, computing features on the CPU: {e}")
             
             logger.info("Model loaded successfully with optimized settings")
             
         except Exception as e:
             logger.error(f"Error loading Whisper model: {e}")
             self.model = None
+            self.load_error = str(e)
+    
+    def _default_beam_size(self) -> int:
+        """Pick the beam size for the device and model size.
+        
+        Returns:
+            Beam size to decode with
+        """
+        # Adjust beam size based on GPU memory and model size. Distilled and turbo
+        # checkpoints are named after the size they derive from (distil-large-v3, ...)
+        is_large = "large" in self.model_size
+        is_medium = "medium" in self.model_size
+        if self.device == "cuda":
+            try:
+                import torch
+                gpu_memory = torch.cuda.get_device_properties(0).total_memory / (1024**3)
+                
+                # RTX 4090 optimization
+                is_rtx_4090 = "4090" in torch.cuda.get_device_name(0)
+                
+                if is_rtx_4090:
+                    logger.info("Optimizing for RTX 4090 GPU")
+                    # RTX 4090 has enough memory for larger beam sizes with all models
+                    if is_large:
+                        return 5  # Maximum quality for large model
+                    else:
+                        return 8  # Larger beam size for smaller models
+                elif gpu_memory > 10:  # More than 10GB VRAM
+                    return 3 if is_large or is_medium else 5
+                elif gpu_memory > 6:   # 6-10GB VRAM
+                    return 3
+                else:                  # <6GB VRAM
+                    return 2
+            except Exception:
+                # Default if we can't determine
+                return 3
+        else:
+            # CPU processing - use smaller beam for faster results
+            return 1
     
-    def transcribe(self, audio: np.ndarray, language: Optional[str] = None) -> str:
+    def transcribe(self, audio: np.ndarray, language: Optional[str] = None, vad_filter: bool = True,
+                   beam_size: Optional[int] = None, partial: bool = False,
+                   on_segment: Optional[Callable[[str], None]] = None, **decode_options) -> str:
         """Transcribe audio using Whisper with optimized parameters and enhanced caching.
         
         Args:
-            audio: Numpy array of audio samples
+            audio: 16 kHz mono float32 samples in [-1, 1]
             language: Language code (optional)
+            vad_filter: Run faster-whisper's Silero pass; disable when the caller already VAD-gated the audio
+            beam_size: Beam size override (defaults to one chosen for the device and model size)
+            partial: Decode with the cheap PARTIAL_DECODE_OPTIONS, for results that latency matters more for
+            on_segment: Called with each segment's text as soon as it is decoded
+            **decode_options: Extra faster-whisper transcribe() options, overriding the defaults below
             
         Returns:
             Transcribed text
@@ -965,13 +1582,10 @@ class WhisperTranscriber:
             cached_text = self.cache.get(audio)
             if cached_text:
                 # Use text formatter to clean up cached text if needed
-                try:
-                    from text_formatter import format_text, detect_language
+                if detect_language is not None:
                     detected_lang = detect_language(cached_text)
                     if detected_lang != "plain":
                         cached_text = format_text(cached_text, detected_lang)
-                except ImportError:
-                    pass
                 
                 logger.info(f"Using enhanced cached transcription")
                 return cached_text
@@ -979,42 +1593,22 @@ class WhisperTranscriber:
             logger.info("Transcribing audio...")
             start_time = time.time()
             
+            # Already 16 kHz mono float32, so this is a no-op for captured audio
+            audio = np.ascontiguousarray(audio, dtype=np.float32)
+            
             # Optimize transcription parameters based on device and model size
-            # Adjust beam size based on GPU memory and model size
-            if self.device == "cuda":
-                try:
-                    import torch
-                    gpu_memory = torch.cuda.get_device_properties(0).total_memory / (1024**3)
-                    
-                    # RTX 4090 optimization
-                    is_rtx_4090 = "4090" in torch.cuda.get_device_name(0)
-                    
-                    if is_rtx_4090:
-                        logger.info("Optimizing for RTX 4090 GPU")
-                        # RTX 4090 has enough memory for larger beam sizes with all models
-                        if self.model_size in ["large"]:
-                            beam_size = 5  # Maximum quality for large model
-                        else:
-                            beam_size = 8  # Larger beam size for smaller models
-                    elif gpu_memory > 10:  # More than 10GB VRAM
-                        beam_size = 5 if self.model_size in ["tiny", "base", "small"] else 3
-                    elif gpu_memory > 6:   # 6-10GB VRAM
-                        beam_size = 3
-                    else:                  # <6GB VRAM
-                        beam_size = 2
-                except Exception:
-                    # Default if we can't determine
-                    beam_size = 3
-            else:
-                # CPU processing - use smaller beam for faster results
-                beam_size = 1
+            if beam_size is None:
+                beam_size = self.beam_size
             
             logger.debug(f"Using beam size: {beam_size} for model: {self.model_size} on {self.device}")
             
             # Dynamic VAD parameters based on audio characteristics
-            audio_power = np.mean(np.abs(audio))
-            is_quiet_audio = audio_power < 0.01
-            vad_threshold = 0.3 if is_quiet_audio else 0.5  # Lower threshold for quiet audio
+            vad_parameters = None
+            if vad_filter:
+                # Only picks between two thresholds, so every 16th sample is plenty for the level
+                audio_power = float(np.abs(audio[::16]).mean())
+                is_quiet_audio = audio_power < 0.01
+                vad_parameters = {"threshold": 0.3 if is_quiet_audio else 0.5}  # Lower threshold for quiet audio
             
             # Check for wake word to use as initial prompt for better context
             initial_prompt = None
@@ -1029,12 +1623,11 @@ class WhisperTranscriber:
                 logger.debug(f"Error getting initial prompt: {e}")
             
             # Optimized parameters for RTX 4090 and other GPUs
-            segments, info = self.model.transcribe(
-                audio,
+            options = dict(
                 language=language,
                 beam_size=beam_size,
-                vad_filter=True,
-                vad_parameters={"threshold": vad_threshold},  # Dynamic threshold
+                vad_filter=vad_filter,
+                vad_parameters=vad_parameters,          # Dynamic threshold
                 condition_on_previous_text=True if initial_prompt else False,  # Use context if available
                 compression_ratio_threshold=2.4,        # Optimize for speed
                 log_prob_threshold=-1.0,                # Optimize for speed
@@ -1042,9 +1635,18 @@ class WhisperTranscriber:
                 initial_prompt=initial_prompt,          # Use context from cache if available
                 word_timestamps=False                   # Disable word timestamps for speed
             )
-            
-            # Combine segments
-            text = " ".join(segment.text for segment in segments)
+            if partial:
+                options.update(self.PARTIAL_DECODE_OPTIONS)
+            options.update(decode_options)
+            segments, info = self.model.transcribe(audio, **options)
+            
+            # Combine segments, reporting each one as soon as faster-whisper yields it
+            texts = []
+            for segment in segments:
+                texts.append(segment.text)
+                if on_segment is not None:
+                    on_segment(segment.text)
+            text = " ".join(texts)
             
             # Update performance metrics
             end_time = time.time()
@@ -1054,14 +1656,11 @@ class WhisperTranscriber:
             avg_time = self.total_transcription_time / self.transcription_count
             
             # Use text formatter to format the text based on content
-            try:
-                from text_formatter import format_text, detect_language
+            if detect_language is not None:
                 detected_lang = detect_language(text)
                 if detected_lang != "plain":
                     text = format_text(text, detected_lang)
                     logger.debug(f"Formatted transcription as {detected_lang}")
-            except ImportError:
-                pass
             
             # Store in enhanced cache
             self.cache.set(audio, text)
@@ -1074,6 +1673,52 @@ class WhisperTranscriber:
             logger.error(f"Error transcribing audio: {e}")
             return ""
     
+    def warmup(self) -> None:
+        """Run silent transcriptions to trigger one-time kernel selection and allocation."""
+        if self.model is None:
+            return
+        
+        try:
+            start_time = time.time()
+            silence = np.zeros(16000, dtype=np.float32)
+            
+            # Twice, so autotuned paths chosen on the first pass are exercised too
+            for _ in range(2):
+                segments, _ = self.model.transcribe(silence, beam_size=1, vad_filter=False)
+                list(segments)
+            
+            logger.info(f"Model warm-up completed in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            logger.warning(f"Model warm-up failed: {e}")
+    
+    def submit(self, audio: np.ndarray, language: Optional[str] = None, vad_filter: bool = True,
+               beam_size: Optional[int] = None, partial: bool = False,
+               on_segment: Optional[Callable[[str], None]] = None, **decode_options) -> Future:
+        """Queue audio for transcription on the transcriber's worker thread.
+        
+        Args:
+            audio: Numpy array of audio samples
+            language: Language code (optional)
+            vad_filter: Whether faster-whisper should run its own VAD pass
+            beam_size: Beam size override
+            partial: Use the fast decoding settings for partial results
+            on_segment: Called (on the worker thread) with each segment's text as it is decoded
+            **decode_options: Extra faster-whisper transcribe() options
+            
+        Returns:
+            Future resolving to the transcribed text
+        """
+        return self._executor.submit(self.transcribe, audio, language, vad_filter, beam_size, partial,
+                                     on_segment=on_segment, **decode_options)
+    
+    def unload(self) -> None:
+        """Finish queued transcriptions, then free the model's weights."""
+        self._executor.shutdown(wait=True)
+        if self.model is not None and self.backend == "faster-whisper":
+            # Frees the CTranslate2 weights now instead of whenever the last reference goes
+            self.model.model.unload_model()
+        self.model = None
+    
     def get_performance_stats(self) -> Dict:
         """Get performance statistics for the transcriber.
         
@@ -1085,6 +1730,7 @@ class WhisperTranscriber:
             "model_size": self.model_size,
             "device": self.device,
             "compute_type": self.compute_type,
+            "backend": self.backend,
             "avg_transcription_time": self.total_transcription_time / max(1, self.transcription_count),
             "transcription_count": self.transcription_count,
         }
@@ -1111,12 +1757,39 @@ class WhisperTranscriber:
 class GenieWhisperServer:
     """Main server class for Genie Whisper."""
     
+    # Minimum seconds between two performance_stats messages
+    STATS_MIN_INTERVAL = 0.5
+    
+    # Bound on queued frontend messages, and the types that may be dropped when it
+    # is reached because the next message of the same type supersedes them
+    OUT_QUEUE_SIZE = 256
+    SHEDDABLE_MESSAGES = {"performance_stats"}
+    
+    # Long utterances are transcribed piecewise: at the next pause once they pass the
+    # soft limit, and unconditionally at Whisper's 30 s window
+    SEGMENT_SOFT_SECONDS = 10
+    SEGMENT_MAX_SECONDS = 30
+    
+    # Segments quieter than this RMS level are not worth a Whisper pass
+    SILENCE_RMS = 0.005
+    
+    # Loaded transcribers kept for instant switching; larger models cost GBs each
+    MODEL_CACHE_SIZE = 2
+    
     def __init__(self, args):
         """Initialize the server.
         
         Args:
             args: Command line arguments
         """
+        # Frontend messages are serialized by the caller and written by a single
+        # writer thread, so stdout I/O never blocks transcription
+        self._out_q = queue.Queue(maxsize=self.OUT_QUEUE_SIZE)
+        threading.Thread(target=self._writer_loop, daemon=True).start()
+        
+        # Commands come from a terminal (typed) or from Electron's pipe
+        self._interactive = sys.stdin.isatty()
+        
         self.model_size = args.model_size
         self.sensitivity = args.sensitivity
         self.use_vad = args.vad
@@ -1126,6 +1799,8 @@ class GenieWhisperServer:
         self.ide = args.ide
         self.device_id = args.device_id
         self.compute_type = args.compute_type
+        self.cpu_threads = args.cpu_threads
+        self.backend = args.backend
         
         # Determine device for Whisper
         if args.gpu and self._is_gpu_available():
@@ -1133,8 +1808,17 @@ class GenieWhisperServer:
         else:
             self.device = "cpu"
         
+        # Static GPU properties, queried once instead of on every stats request
+        self._gpu_static = self._query_gpu_static()
+        
+        # Performance stats rate limiting; requests inside the interval are
+        # coalesced into a single deferred send of the latest snapshot
+        self._last_stats_sent = 0.0
+        self._stats_timer = None
+        self._stats_lock = threading.Lock()
+        
         # Initialize audio processor with default device first and increased gain
-        self.audio_processor = AudioProcessor(device_id=self.device_id, gain=5.0)  # Increase gain by 5x
+        self.audio_processor = AudioProcessor(chunk_size=args.chunk_size, device_id=self.device_id, gain=5.0)  # Increase gain by 5x
         
         # Then find and set Focusrite device if available
         focusrite_id = self._find_focusrite_device()
@@ -1148,20 +1832,34 @@ class GenieWhisperServer:
         self.transcriber = WhisperTranscriber(
             model_size=self.model_size,
             device=self.device,
-            compute_type=self.compute_type
+            compute_type=self.compute_type,
+            cpu_threads=self.cpu_threads,
+            backend=self.backend,
+            offline=self.offline_mode
         )
         
+        # Loaded transcribers in least-recently-used order, so switching back to a
+        # previous model size is instant
+        self._model_cache: "OrderedDict[Tuple[str, str, str], WhisperTranscriber]" = OrderedDict()
+        if self.transcriber.model is None:
+            # Left out of the cache, so selecting this size again retries the load
+            self._send_message({"type": "error", "error": f"Failed to load {self.model_size} model: {self.transcriber.load_error}"})
+        else:
+            self._model_cache[(self.model_size, self.device, self.compute_type)] = self.transcriber
+        self._models_loading: Set[Tuple[str, str, str]] = set()
+        # Guards both of the above: background loaders update them while the command thread reads them
+        self._model_cache_lock = threading.Lock()
+        
         # Initialize wake word detector if needed
         if self.activation_mode == "wake_word":
             try:
                 self.wake_word_detector = create_wake_word_detector(
-                    "whisper",
-                    wake_word=self.wake_word,
-                    threshold=self.sensitivity
+                    "whisper", **self._wake_word_detector_kwargs()
                 )
                 logger.info(f"Wake word detector initialized with wake word: {self.wake_word}")
             except Exception as e:
                 logger.error(f"Error initializing wake word detector: {e}")
+                self._send_message({"type": "error", "error": f"Wake word detection is unavailable: {e}"})
                 self.wake_word_detector = None
                 self.activation_mode = "manual"  # Fallback to manual mode
         else:
@@ -1177,10 +1875,17 @@ class GenieWhisperServer:
         self.reset_wake_word_after_silence = getattr(args, 'reset_wake_word', True) # Default True
 
         self.speech_active = False
-        self.accumulated_audio = []
+        self.segment_start = None # Ring buffer position where the current utterance starts
         self.last_speech_time = 0
         self.wake_word_detected = False # Will be True only if wake word mode is active and word is heard
         self.speech_started_time = 0 # To track timeout after wake word
+        self._last_segment_text = None # Last partial transcription of the current utterance, to drop repeats
+        
+        # One long-lived transcription thread serves every listening session, so
+        # start/stop cycles don't spawn threads or leave an old loop consuming audio
+        self._listen_event = threading.Event()
+        self._session = 0  # Incremented by each start, so a loop can tell its session has ended
+        threading.Thread(target=self._transcription_worker, name="transcription", daemon=True).start()
     def _find_focusrite_device(self) -> Optional[int]:
         """Find the Focusrite audio interface device ID.
         
@@ -1209,6 +1914,25 @@ class GenieWhisperServer:
         except ImportError:
             return False
     
+    def _query_gpu_static(self) -> Dict[str, Any]:
+        """Query GPU properties that do not change while the server runs.
+        
+        Returns:
+            Dictionary with the GPU name and total memory, empty if no GPU is available
+        """
+        try:
+            import torch
+            if torch.cuda.is_available():
+                return {
+                    "gpu_name": torch.cuda.get_device_name(0),
+                    "gpu_memory_total": torch.cuda.get_device_properties(0).total_memory / (1024**3)
+                }
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning(f"Error querying GPU properties: {e}")
+        return {}
+    
     def start(self) -> None:
         """Start the server."""
         logger.info("Starting Genie Whisper server")
@@ -1235,8 +1959,6 @@ class GenieWhisperServer:
                 if command:
                     self._handle_command(command)
                 
-                time.sleep(0.1)
-                
         except KeyboardInterrupt:
             logger.info("Server stopped by user")
         except Exception as e:
@@ -1278,17 +2000,24 @@ class GenieWhisperServer:
     def _read_command(self) -> Optional[Dict]:
         """Read command from stdin."""
         try:
-            if sys.stdin.isatty():
+            if self._interactive:
                 # Interactive mode
                 line = input()
             else:
-                # Non-interactive mode (from Electron)
-                line = sys.stdin.readline().strip()
+                # Non-interactive mode (from Electron); readline blocks until a line arrives.
+                # The raw bytes go straight to the JSON parser, skipping a str decode.
+                line = sys.stdin.buffer.readline()
+                if not line:
+                    # Closed pipe: readline returns "" immediately from now on
+                    raise EOFError
+                line = line.strip()
                 
             if not line:
                 return None
                 
-            return json.loads(line)
+            # Both parsers take str or bytes; orjson.JSONDecodeError subclasses
+            # json.JSONDecodeError, so one handler covers both
+            return orjson.loads(line) if orjson else json.loads(line)
             
         except EOFError:
             # End of input
@@ -1309,7 +2038,7 @@ class GenieWhisperServer:
         elif cmd_type == "stop_listening":
             self._stop_listening()
         elif cmd_type == "get_devices":
-            self._get_audio_devices()
+            self._get_audio_devices(command.get("refresh", False))
         elif cmd_type == "set_device":
             self._set_audio_device(command.get("device_id"))
         elif cmd_type == "update_settings":
@@ -1322,20 +2051,37 @@ class GenieWhisperServer:
             logger.warning(f"Unknown command: {cmd_type}")
     
     def _get_performance_stats(self) -> None:
-        """Get performance statistics."""
+        """Get performance statistics, sending at most one message per STATS_MIN_INTERVAL."""
+        with self._stats_lock:
+            wait = self.STATS_MIN_INTERVAL - (time.monotonic() - self._last_stats_sent)
+            if wait > 0:
+                # A deferred send will pick up the latest stats; don't stack another one
+                if self._stats_timer is None:
+                    self._stats_timer = threading.Timer(wait, self._send_performance_stats)
+                    self._stats_timer.daemon = True
+                    self._stats_timer.start()
+                return
+        
+        self._send_performance_stats()
+    
+    def _send_performance_stats(self) -> None:
+        """Collect performance statistics and send them to the frontend."""
+        with self._stats_lock:
+            self._stats_timer = None
+            self._last_stats_sent = time.monotonic()
+        
         # Get transcriber performance stats
         stats = self.transcriber.get_performance_stats()
         
         # Add GPU information if available
-        try:
-            import torch
-            if torch.cuda.is_available():
-                stats["gpu_name"] = torch.cuda.get_device_name(0)
-                stats["gpu_memory_total"] = torch.cuda.get_device_properties(0).total_memory / (1024**3)
+        if self._gpu_static:
+            stats.update(self._gpu_static)
+            try:
+                import torch
                 stats["gpu_memory_allocated"] = torch.cuda.memory_allocated(0) / (1024**3)
                 stats["gpu_memory_reserved"] = torch.cuda.memory_reserved(0) / (1024**3)
-        except:
-            pass
+            except Exception as e:
+                logger.warning(f"Error querying GPU memory usage: {e}")
         
         # Send performance stats to frontend
         self._send_message({
@@ -1348,6 +2094,7 @@ class GenieWhisperServer:
         if self.is_listening:
             return
             
+        self._session += 1
         self.is_listening = True
         self._send_message({
             "type": "status",
@@ -1357,8 +2104,8 @@ class GenieWhisperServer:
         # Start recording
         self.audio_processor.start_recording()
         
-        # Start transcription thread
-        threading.Thread(target=self._transcription_loop, daemon=True).start()
+        # Wake the transcription thread
+        self._listen_event.set()
     
     def _stop_listening(self) -> None:
         """Stop listening for speech."""
@@ -1371,61 +2118,58 @@ class GenieWhisperServer:
             "status": "Stopped listening"
         })
         
-        # Stop recording and get final audio
-        audio = self.audio_processor.stop_recording()
-        
-        # Filter audio with VAD if enabled
-        if self.use_vad:
-            filtered_audio = self.audio_processor.filter_audio(audio)
-            
-            # Check if we have any speech after filtering
-            if len(filtered_audio) > 0:
-                audio = filtered_audio
-                logger.info("Speech detected in final audio")
-            else:
-                logger.info("No speech detected in final audio")
-                self._send_message({
-                    "type": "status",
-                    "status": "No speech detected"
-                })
-                return
-        
-        # Transcribe final audio
-        if len(audio) > 0:
-            text = self.transcriber.transcribe(audio)
-            
-            if text:
-                self._send_message({
-                    "type": "transcription",
-                    "text": text,
-                    "final": True
-                })
-                
-                # Inject text into IDE if specified
-                if self.ide:
-                    self._inject_text(text, self.ide)
+        # The transcription loop transcribes the last utterance as it exits
+        self.audio_processor.stop_recording()
+    
+    def _transcription_worker(self) -> None:
+        """Run one transcription loop per listening session, sleeping in between."""
+        while True:
+            self._listen_event.wait()
+            self._listen_event.clear()
+            if not self.is_listening:
+                # Set by a start that was already stopped again: there is no session to run
+                continue
+            try:
+                self._transcription_loop(self._session)
+            except Exception as e:
+                logger.error(f"Error in transcription loop: {e}")
     
-    def _transcription_loop(self) -> None:
-        """Continuously processes audio chunks for transcription with silence detection."""
+    def _transcription_loop(self, session: int) -> None:
+        """Continuously processes audio chunks for transcription with silence detection.
+        
+        Args:
+            session: The listening session this loop serves. The loop ends when that
+                session stops, even if a new one has already started, so every session
+                flushes its own last utterance and the next one starts from fresh state
+        """
         logger.info("Starting real-time transcription loop...")
 
-        # Reset state variables at the start of the loop
+        # Reset state variables at the start of the loop. The read position is owned by
+        # this thread, so dropping the previous session's leftover audio happens here
+        self.audio_processor.ring_buffer.skip_to_session()
         self.speech_active = False
-        self.accumulated_audio = []
-        self.last_speech_time = time.time() # Initialize last speech time
+        self.segment_start = None
+        self.last_speech_time = time.monotonic() # Initialize last speech time
         # Reset wake word detected state based on activation mode
         self.wake_word_detected = self.activation_mode != "wake_word"
         self.speech_started_time = 0
+        self._last_segment_text = None
 
         if self.activation_mode == "wake_word":
              self._send_message({"type": "status", "data": "listening_for_wake_word"})
         else:
              self._send_message({"type": "status", "data": "listening_continuously"})
 
+        # Thresholds in seconds, computed once rather than on every iteration
+        silence_timeout = self.silence_threshold_ms / 1000.0
+        wake_word_timeout = self.wake_word_timeout_ms / 1000.0
+        soft_segment_samples = self.SEGMENT_SOFT_SECONDS * self.audio_processor.sample_rate
+        max_segment_samples = self.SEGMENT_MAX_SECONDS * self.audio_processor.sample_rate
 
-        while self.is_listening:
-            # Get audio chunk from the queue
+        while self.is_listening and self._session == session:
+            # Block until the audio callback signals new samples (or the timeout expires)
             current_chunk = self.audio_processor.get_audio_chunk(timeout=0.1) # Short timeout
+            now = time.monotonic() # One clock read per iteration
 
             if current_chunk is not None:
                 # --- Wake Word Detection ---
@@ -1433,10 +2177,10 @@ class GenieWhisperServer:
                     if self.wake_word_detector and self.wake_word_detector.detect(current_chunk):
                         logger.info("Wake word detected!")
                         self.wake_word_detected = True
-                        self.speech_started_time = time.time() # Start speech timer on wake word
-                        self.accumulated_audio = [] # Reset buffer on wake word
+                        self.speech_started_time = now # Start speech timer on wake word
+                        self.segment_start = None # Reset utterance on wake word
                         self.speech_active = False # Reset speech active flag
-                        self.last_speech_time = time.time() # Reset silence timer
+                        self.last_speech_time = now # Reset silence timer
                         self._send_message({"type": "status", "data": "wake_word_detected"})
                         # Skip processing this chunk as it was the wake word
                         continue
@@ -1446,63 +2190,78 @@ class GenieWhisperServer:
 
                 # --- VAD and Speech Accumulation ---
                 is_speech = False
-                if self.use_vad and self.audio_processor.vad:
+                if np.dot(current_chunk, current_chunk) / len(current_chunk) < self.SILENCE_RMS ** 2:
+                    # Too quiet to be speech: skip the VAD model, and without VAD this
+                    # lets silence end the utterance instead of being transcribed
+                    pass
+                elif self.use_vad and self.audio_processor.vad:
                     try:
-                        # Assuming VAD works on chunks directly
-                        is_speech = self.audio_processor.vad.is_speech(current_chunk.squeeze())
+                        # Chunks come out of the ring buffer already 1-D
+                        is_speech = self.audio_processor.vad.is_speech(current_chunk)
                     except Exception as e:
                         logger.error(f"Error during VAD processing in loop: {e}")
                 else:
                     # If VAD is disabled, treat every chunk as speech
                     is_speech = True
 
+                # Once speech starts, every following chunk (including trailing silence)
+                # belongs to the utterance, so it is a contiguous range of the ring buffer
                 if is_speech:
                     if not self.speech_active:
                         logger.debug("Speech started.")
                         self.speech_active = True
+                        self.segment_start = self.audio_processor.ring_buffer.position - len(current_chunk)
                         # Optionally capture timestamp of speech start
-                        # self.speech_started_time = time.time() # Reset this? Or keep from wake word?
-                    self.accumulated_audio.append(current_chunk)
-                    self.last_speech_time = time.time()
+                        # self.speech_started_time = now # Reset this? Or keep from wake word?
+                    self.last_speech_time = now
                 elif self.speech_active:
                     # Speech was active, now silence or VAD says no speech
-                    self.accumulated_audio.append(current_chunk) # Include potentially trailing silence chunk
-                    silence_duration = time.time() - self.last_speech_time
-                    logger.debug(f"Silence detected. Duration: {silence_duration:.2f}s")
+                    silence_duration = now - self.last_speech_time
+                    logger.debug("Silence detected. Duration: %.2fs", silence_duration)
 
                     # Check if silence duration exceeds threshold
-                    if silence_duration > self.silence_threshold_ms / 1000.0:
+                    if silence_duration > silence_timeout:
                         logger.info(f"Significant silence ({silence_duration:.2f}s) detected after speech. Processing accumulated audio.")
                         self._process_accumulated_audio() # Process the audio
                         # State reset happens within _process_accumulated_audio
 
+                # Hand long dictation to Whisper as it goes instead of all at once at the end
+                if self.speech_active:
+                    segment_samples = self.audio_processor.ring_buffer.position - self.segment_start
+                    if segment_samples >= max_segment_samples or \
+                       (not is_speech and segment_samples >= soft_segment_samples):
+                        logger.info(f"Utterance reached {segment_samples / self.audio_processor.sample_rate:.1f}s, transcribing it so far.")
+                        self._process_accumulated_audio(final=False)
+
             # --- Timeout Checks ---
-            else: # current_chunk is None (queue was empty)
+            else: # current_chunk is None (no audio arrived before the timeout)
                 # Check if speech was active but we haven't received data or speech for a while
-                if self.speech_active and (time.time() - self.last_speech_time > self.silence_threshold_ms / 1000.0):
-                    logger.info(f"Processing accumulated audio due to timeout after speech ({time.time() - self.last_speech_time:.2f}s).")
+                if self.speech_active and (now - self.last_speech_time > silence_timeout):
+                    logger.info(f"Processing accumulated audio due to timeout after speech ({now - self.last_speech_time:.2f}s).")
                     self._process_accumulated_audio() # Process the audio
 
                 # Check for timeout after wake word detection if no speech started
                 if self.activation_mode == "wake_word" and self.wake_word_detected and not self.speech_active and \
-                   (time.time() - self.speech_started_time > self.wake_word_timeout_ms / 1000.0):
+                   (now - self.speech_started_time > wake_word_timeout):
                     logger.info("Timeout waiting for speech after wake word.")
                     self.wake_word_detected = False # Reset wake word
                     self._send_message({"type": "status", "data": "listening_for_wake_word"}) # Inform frontend
 
-            # Small sleep to prevent high CPU usage when queue is empty frequently
-            time.sleep(0.01)
-
         logger.info("Transcription loop finished.")
         # Process any remaining audio when listening stops
-        if self.accumulated_audio:
+        if self.segment_start is not None:
              logger.info("Processing remaining accumulated audio after loop exit.")
              self._process_accumulated_audio()
 
 
-    def _process_accumulated_audio(self):
-        """Helper function to process accumulated audio, transcribe, and reset state."""
-        if not self.accumulated_audio:
+    def _process_accumulated_audio(self, final: bool = True):
+        """Helper function to process accumulated audio, transcribe, and reset state.
+        
+        Args:
+            final: False when flushing part of an ongoing utterance; the utterance
+                then continues from the current position instead of being reset
+        """
+        if self.segment_start is None:
             logger.debug("No accumulated audio to process.")
             # Reset state even if buffer is empty after silence trigger
             self.speech_active = False
@@ -1512,39 +2271,82 @@ class GenieWhisperServer:
             return
 
         try:
-            # Combine accumulated chunks
-            audio_to_process = np.concatenate(self.accumulated_audio)
+            # The utterance is everything consumed since it started
+            audio_to_process = self.audio_processor.snapshot(self.segment_start)
             audio_duration = len(audio_to_process) / self.audio_processor.sample_rate
             logger.info(f"Processing {audio_duration:.2f}s of accumulated audio...")
+            
+            # A dot product is far cheaper than an encoder pass over silence (e.g. with VAD off)
+            n = len(audio_to_process)
+            if n == 0 or np.dot(audio_to_process, audio_to_process) / n < self.SILENCE_RMS ** 2:
+                logger.info("Segment is silent, skipping transcription")
+                return
 
             # --- Transcription ---
             start_transcribe_time = time.time()
-            # Optional: Filter the combined audio again if needed
-            # filtered_audio = self.audio_processor.filter_audio(audio_to_process)
-            # transcription = self.transcriber.transcribe(filtered_audio)
-            transcription = self.transcriber.transcribe(audio_to_process)
+            # The segment is already bounded by the loop's VAD, so skip faster-whisper's second pass
+            vad_gated = self.use_vad and self.audio_processor.vad is not None
+            # Show a final's text as each Whisper segment is decoded instead of after the whole
+            # utterance. Partials are not streamed: they are only sent once the duplicate check
+            # below has passed, or a repeated one would reach the frontend piece by piece
+            streamed = []
+            def send_segment(segment_text: str) -> None:
+                streamed.append(segment_text.strip())
+                self._send_message({"type": "transcription", "text": " ".join(streamed), "final": False})
+            
+            # Pieces of an ongoing utterance use the fast partial decoding so Whisper keeps up while the user talks
+            transcription = self.transcriber.submit(
+                audio_to_process, vad_filter=not vad_gated, partial=not final,
+                on_segment=send_segment if final else None
+            ).result()
             end_transcribe_time = time.time()
             logger.info(f"Transcription: '{transcription}' (took {end_transcribe_time - start_transcribe_time:.2f}s)")
 
-            if transcription.strip():
+            if not final and transcription.strip() == self._last_segment_text:
+                # A partial repeating the previous one (typically a hallucination on a noisy
+                # pause): don't resend or re-inject it. Finals are always sent, since the
+                # user may well say the same thing twice
+                logger.debug("Skipping duplicate partial transcription")
+            elif transcription.strip():
+                if not final:
+                    self._last_segment_text = transcription.strip()
                 # Send transcription to frontend/IDE
-                self._send_message({"type": "transcription", "data": transcription, "final": True}) # Mark as final
+                self._send_message({"type": "transcription", "text": transcription, "final": final})
                 self._inject_text(transcription) # Inject into IDE
 
-                # Add to cache
-                self.cache.set(audio_to_process, transcription) # Use the cache object from __init__
-
         except Exception as e:
             logger.error(f"Error during transcription processing: {e}")
         finally:
-            # --- Reset State ---
-            self.accumulated_audio = []
-            self.speech_active = False
-            # Reset wake word detection if necessary
-            if self.activation_mode == "wake_word" and self.reset_wake_word_after_silence:
-                logger.info("Resetting wake word detection after processing.")
-                self.wake_word_detected = False
-                self._send_message({"type": "status", "data": "listening_for_wake_word"})
+            if not final:
+                # Keep accumulating the same utterance from where this piece ended
+                self.segment_start = self.audio_processor.ring_buffer.position
+            else:
+                # --- Reset State ---
+                self.segment_start = None
+                self.speech_active = False
+                self._last_segment_text = None  # The next utterance has no partials to repeat yet
+                # Reset wake word detection if necessary
+                if self.activation_mode == "wake_word" and self.reset_wake_word_after_silence:
+                    logger.info("Resetting wake word detection after processing.")
+                    self.wake_word_detected = False
+                    self._send_message({"type": "status", "data": "listening_for_wake_word"})
+    
+    def _wake_word_detector_kwargs(self) -> Dict[str, Any]:
+        """Build the wake word detector arguments.
+        
+        The always-on wake word model is kept off the GPU that runs the main
+        transcriber so the two never queue behind each other: on multi-GPU
+        machines it gets the second device, otherwise it stays on the CPU.
+        """
+        kwargs = {"wake_word": self.wake_word, "threshold": self.sensitivity, "offline": self.offline_mode}
+        if self.device != "cuda":
+            return kwargs
+        import torch
+        if torch.cuda.device_count() > 1:
+            # Like the main model, let CTranslate2 pick a type the GPU supports: int8 types
+            # fail to load on GPUs without int8 support, which would disable wake word mode
+            kwargs.update(device="cuda", device_index=1, compute_type="auto")
+        return kwargs
     
     def _start_wake_word_detection(self) -> None:
         """Start wake word detection."""
@@ -1586,9 +2388,13 @@ class GenieWhisperServer:
         
         logger.info("Wake word detection stopped")
     
-    def _get_audio_devices(self) -> None:
-        """Get available audio devices."""
-        devices = self.audio_processor.get_audio_devices()
+    def _get_audio_devices(self, refresh: bool = False) -> None:
+        """Get available audio devices.
+        
+        Args:
+            refresh: Re-enumerate devices instead of using the cached list
+        """
+        devices = self.audio_processor.get_audio_devices(refresh)
         
         self._send_message({
             "type": "devices",
@@ -1618,11 +2424,7 @@ class GenieWhisperServer:
         # Update model size if changed
         if "modelSize" in settings and settings["modelSize"] != self.model_size:
             self.model_size = settings["modelSize"]
-            self.transcriber = WhisperTranscriber(
-                model_size=self.model_size,
-                device=self.device,
-                compute_type=self.compute_type
-            )
+            self._switch_model()
         
         # Update other settings
         if "sensitivity" in settings:
@@ -1642,10 +2444,10 @@ class GenieWhisperServer:
                 self._stop_wake_word_detection()
                 
                 # Recreate wake word detector
+                self.wake_word_detector = None
+                self._release_gpu_memory()
                 self.wake_word_detector = create_wake_word_detector(
-                    "whisper",
-                    wake_word=self.wake_word,
-                    threshold=self.sensitivity
+                    "whisper", **self._wake_word_detector_kwargs()
                 )
                 
                 self._start_wake_word_detection()
@@ -1672,6 +2474,112 @@ class GenieWhisperServer:
             "status": "Settings updated"
         })
     
+    def _release_gpu_memory(self) -> None:
+        """Collect dropped models and hand their cached CUDA blocks back."""
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+    
+    def _switch_model(self) -> None:
+        """Switch to the transcriber for the current model settings.
+        
+        Cached transcribers are swapped in immediately. Otherwise the model is
+        loaded on a background thread so the command loop stays responsive, and
+        the current transcriber keeps serving until the new one is ready.
+        """
+        key = (self.model_size, self.device, self.compute_type)
+        
+        with self._model_cache_lock:
+            cached = self._model_cache.get(key)
+            if cached is not None:
+                self._model_cache.move_to_end(key)
+                self.transcriber = cached
+            elif key in self._models_loading:
+                # Already loading (e.g. the user toggled away and back): that load will swap it in
+                return
+            else:
+                self._models_loading.add(key)
+        
+        if cached is not None:
+            logger.info(f"Switched to cached {self.model_size} model")
+            return
+        self._send_message({"type": "status", "status": f"Loading {key[0]} model"})
+        
+        def load_model():
+            try:
+                transcriber = WhisperTranscriber(*key, cpu_threads=self.cpu_threads, backend=self.backend,
+                                                 offline=self.offline_mode)
+                if transcriber.model is None:
+                    # _load_model logs and swallows its errors. Don't cache or swap in a
+                    # transcriber that can only return "", keep serving with the current one
+                    transcriber._executor.shutdown(wait=False)
+                    raise RuntimeError(transcriber.load_error)
+                activated = self._cache_transcriber(key, transcriber)
+            except Exception as e:
+                logger.error(f"Error loading {key[0]} model: {e}")
+                self._send_message({"type": "error", "error": f"Failed to load {key[0]} model: {e}"})
+                self._send_message({"type": "status", "status": f"Failed to load {key[0]} model"})
+                return
+            finally:
+                with self._model_cache_lock:
+                    self._models_loading.discard(key)
+            
+            if activated:
+                logger.info(f"Switched to {self.model_size} model")
+                self._send_message({"type": "status", "status": f"{key[0]} model ready"})
+        
+        threading.Thread(target=load_model, daemon=True).start()
+    
+    def _cache_transcriber(self, key: Tuple[str, str, str], transcriber: WhisperTranscriber) -> bool:
+        """Add a loaded transcriber to the model cache, evicting the least recently used ones.
+        
+        The transcriber is also swapped in if the settings still ask for it. The active
+        transcriber is never evicted.
+        
+        Returns:
+            True if the transcriber was made the active one
+        """
+        evicted = []
+        with self._model_cache_lock:
+            self._model_cache[key] = transcriber
+            
+            # Only swap if the settings did not change again while loading
+            activated = (self.model_size, self.device, self.compute_type) == key
+            if activated:
+                # The outgoing transcriber was in use until now, so it is the next most
+                # recently used; a transcription racing the swap may still submit to it
+                previous_key = next((k for k, t in self._model_cache.items() if t is self.transcriber), None)
+                if previous_key is not None:
+                    self._model_cache.move_to_end(previous_key)
+                self._model_cache.move_to_end(key)
+                self.transcriber = transcriber
+            
+            while len(self._model_cache) > self.MODEL_CACHE_SIZE:
+                # Never evict the active transcriber or the one just loaded
+                old_key = next((k for k, t in self._model_cache.items()
+                                if k != key and t is not self.transcriber), None)
+                if old_key is None:
+                    break
+                evicted.append((old_key, self._model_cache.pop(old_key)))
+        
+        # Unloading and freeing memory happens outside the lock. Any work already
+        # queued on an evicted transcriber finishes before its model is unloaded
+        for old_key, old_transcriber in evicted:
+            old_transcriber.unload()
+            logger.info(f"Evicted cached {old_key[0]} model")
+        
+        if evicted:
+            # Drop the last references first, or nothing is left for the collector to free
+            del old_transcriber
+            evicted.clear()
+            self._release_gpu_memory()
+        
+        return activated
+    
     def _inject_text(self, text: str, ide: Optional[str] = None) -> None:
         """Inject text into IDE.
         
@@ -1700,10 +2608,49 @@ class GenieWhisperServer:
     def _send_message(self, message: Dict) -> None:
         """Send a message to the frontend."""
         try:
-            print(json.dumps(message), flush=True)
+            # numpy scalars and arrays (e.g. in stats) serialize natively, no Python-side conversion
+            if orjson is not None:
+                data = orjson.dumps(message, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+            else:
+                # Compact separators, like orjson's output, to keep each line short
+                data = json.dumps(message, separators=(",", ":"),
+                                  default=lambda o: o.tolist() if hasattr(o, "tolist") else str(o)).encode("utf-8") + b"\n"
+            try:
+                self._out_q.put_nowait(data)
+            except queue.Full:
+                # The frontend stopped reading: shed what it won't miss, and give
+                # everything else a bounded wait rather than growing without limit
+                if message.get("type") in self.SHEDDABLE_MESSAGES:
+                    logger.debug("Output queue full, dropping %s message", message.get("type"))
+                    return
+                self._out_q.put(data, timeout=1.0)
+        except queue.Full:
+            logger.error(f"Output queue full, dropped {message.get('type')} message")
         except Exception as e:
             logger.error(f"Error sending message: {e}")
     
+    def _writer_loop(self) -> None:
+        """Write queued messages to stdout, flushing once per drained batch."""
+        out = sys.stdout.buffer
+        while True:
+            batch = [self._out_q.get()]
+            
+            # Batch whatever queued up meanwhile into the same write and flush
+            try:
+                while True:
+                    batch.append(self._out_q.get_nowait())
+            except queue.Empty:
+                pass
+            
+            try:
+                out.write(b"".join(batch))
+                out.flush()
+            except Exception as e:
+                logger.error(f"Error writing message: {e}")
+            finally:
+                for _ in batch:
+                    self._out_q.task_done()
+    
     def _cleanup(self) -> None:
         """Clean up resources."""
         logger.info("Cleaning up")
@@ -1716,6 +2663,9 @@ class GenieWhisperServer:
         # Stop wake word detection if active
         if self.wake_word_active:
             self._stop_wake_word_detection()
+        
+        # Make sure queued messages reach the frontend before exiting
+        self._out_q.join()
 
 
 def parse_args():
@@ -1726,7 +2676,7 @@ def parse_args():
         "--model-size",
         type=str,
         default="base",
-        choices=["tiny", "base", "small", "medium", "large"],
+        choices=WhisperTranscriber.MODEL_SIZES,
         help="Whisper model size"
     )
     
@@ -1791,8 +2741,31 @@ def parse_args():
         "--compute-type",
         type=str,
         default="auto",
-        choices=["auto", "int8", "float16", "float32"],
-        help="Compute type for Whisper model"
+        choices=["auto", "int8", "int8_float16", "float16", "bfloat16", "float32"] + WhisperTranscriber.GGML_QUANT_TYPES,
+        help="Compute type for Whisper model (auto picks int8_float16/float16 on GPU, int8/float32 on CPU; "
+             "q* types pick a quantized ggml model with the whisper.cpp backend)"
+    )
+    
+    parser.add_argument(
+        "--cpu-threads",
+        type=int,
+        default=0,
+        help="CPU threads for Whisper inference (0 = one per physical core)"
+    )
+    
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=4000,
+        help="Audio samples per capture block and VAD chunk (4000 = 250 ms at 16 kHz; 1600 for lower latency)"
+    )
+    
+    parser.add_argument(
+        "--backend",
+        type=str,
+        default="faster-whisper",
+        choices=WhisperTranscriber.BACKENDS,
+        help="Whisper inference backend (whisper.cpp needs pywhispercpp and uses less memory on CPU)"
     )
 
     parser.add_argument(
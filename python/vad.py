@@ -9,9 +9,12 @@ This module provides VAD functionality using Silero VAD.
 import logging
 import os
 import sys
+import threading
 import torch
 import numpy as np
-from typing import List, Tuple, Optional
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple, Optional
 
 # Configure logging
 logging.basicConfig(
@@ -21,6 +24,41 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+class _SharedSileroModel:
+    """A loaded Silero model shared by SileroVAD instances.
+    
+    The model carries RNN state from one call to the next, so the lock lets only one
+    instance run it at a time, and an instance taking over from another one starts
+    from fresh state.
+    """
+    
+    def __init__(self, model: Any, utils: Optional[tuple]):
+        self.model = model
+        self.utils = utils
+        self.lock = threading.Lock()
+        self.user = None  # SileroVAD that ran the model last
+
+
+# Loaded Silero models keyed by (use_onnx, device), so every SileroVAD in the
+# process (including the one inside HybridVAD) shares one copy of the weights
+_SILERO_MODELS: Dict[Tuple[bool, str], _SharedSileroModel] = {}
+
+
+def _collect_segments(audio: np.ndarray, segments: List[Tuple[int, int]]) -> np.ndarray:
+    """Copy the given (start, end) sample ranges of audio into one new array.
+    
+    The output is allocated once and filled slice by slice, instead of building a
+    list of views for np.concatenate.
+    """
+    bounds = [(start, min(end, len(audio))) for start, end in segments]
+    out = np.empty(sum(max(0, end - start) for start, end in bounds), dtype=audio.dtype)
+    offset = 0
+    for start, end in bounds:
+        if end > start:
+            out[offset:offset + end - start] = audio[start:end]
+            offset += end - start
+    return out
+
 class SileroVAD:
     """Voice Activity Detection using Silero VAD."""
     
@@ -41,6 +79,7 @@ class SileroVAD:
         self.sample_rate = sample_rate
         self.use_onnx = use_onnx
         self.model = None
+        self._shared: Optional[_SharedSileroModel] = None
         self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
         
         # Load the model
@@ -48,6 +87,15 @@ class SileroVAD:
     
     def _load_model(self) -> None:
         """Load the Silero VAD model."""
+        cached = _SILERO_MODELS.get((self.use_onnx, self.device))
+        if cached is not None:
+            self._shared = cached
+            self.model = cached.model
+            if cached.utils is not None:
+                self._bind_utils(cached.utils)
+            logger.info("Reusing loaded Silero VAD model")
+            return
+        
         logger.info("Loading Silero VAD model")
         
         try:
@@ -68,15 +116,29 @@ class SileroVAD:
                         onnx_model_path
                     )
                 
-                # Load ONNX model
+                # Load ONNX model; the model is tiny, so one intra-op thread and no
+                # memory arena keep the session from holding threads and RAM it doesn't need
                 import onnxruntime
-                self.model = onnxruntime.InferenceSession(onnx_model_path)
+                options = onnxruntime.SessionOptions()
+                options.intra_op_num_threads = 1
+                options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+                options.enable_cpu_mem_arena = False
+                self.model = onnxruntime.InferenceSession(onnx_model_path, sess_options=options)
+                self._shared = _SILERO_MODELS[(self.use_onnx, self.device)] = _SharedSileroModel(self.model, None)
                 logger.info("Silero VAD ONNX model loaded")
             else:
-                # PyTorch model
+                # PyTorch model. Load the cached checkout directly when there is one:
+                # given a GitHub name, torch.hub queries GitHub for the default branch
+                # on every load, even when the repo is already cached
+                cached_repo = os.path.join(torch.hub.get_dir(), 'snakers4_silero-vad_master')
+                if os.path.isdir(cached_repo):
+                    repo, source = cached_repo, 'local'
+                else:
+                    repo, source = 'snakers4/silero-vad', 'github'
                 self.model, utils = torch.hub.load(
-                    repo_or_dir='snakers4/silero-vad',
+                    repo_or_dir=repo,
                     model='silero_vad',
+                    source=source,
                     force_reload=False,
                     onnx=False,
                     verbose=False
@@ -85,12 +147,8 @@ class SileroVAD:
                 # Move model to device
                 self.model = self.model.to(self.device)
                 
-                # Get utils
-                self.get_speech_timestamps = utils[0]
-                self.save_audio = utils[1]
-                self.read_audio = utils[2]
-                self.VADIterator = utils[3]
-                self.collect_chunks = utils[4]
+                self._bind_utils(utils)
+                self._shared = _SILERO_MODELS[(self.use_onnx, self.device)] = _SharedSileroModel(self.model, utils)
                 
                 logger.info(f"Silero VAD PyTorch model loaded on {self.device}")
         
@@ -98,6 +156,24 @@ class SileroVAD:
             logger.error(f"Error loading Silero VAD model: {e}")
             self.model = None
     
+    def _bind_utils(self, utils: tuple) -> None:
+        """Expose the Silero helper functions returned by torch.hub."""
+        self.get_speech_timestamps = utils[0]
+        self.save_audio = utils[1]
+        self.read_audio = utils[2]
+        self.VADIterator = utils[3]
+        self.collect_chunks = utils[4]
+    
+    @contextmanager
+    def _exclusive_model(self):
+        """Hold the shared model for one call, resetting its state if another instance ran it last."""
+        with self._shared.lock:
+            if self._shared.user is not self:
+                if hasattr(self.model, 'reset_states'):
+                    self.model.reset_states()
+                self._shared.user = self
+            yield
+    
     def is_speech(self, audio: np.ndarray) -> bool:
         """Check if audio contains speech.
         
@@ -122,7 +198,7 @@ class SileroVAD:
             audio_tensor = audio_tensor.to(self.device)
             
             # Get speech probability
-            with torch.no_grad():
+            with self._exclusive_model(), torch.no_grad():
                 speech_prob = self.model(audio_tensor, self.sample_rate).item()
             
             # Check if probability exceeds threshold
@@ -158,12 +234,13 @@ class SileroVAD:
             audio_tensor = audio_tensor.to(self.device)
             
             # Get speech timestamps
-            speech_timestamps = self.get_speech_timestamps(
-                audio_tensor,
-                self.model,
-                threshold=self.threshold,
-                sampling_rate=self.sample_rate
-            )
+            with self._exclusive_model():
+                speech_timestamps = self.get_speech_timestamps(
+                    audio_tensor,
+                    self.model,
+                    threshold=self.threshold,
+                    sampling_rate=self.sample_rate
+                )
             
             # Convert timestamps to (start, end) tuples
             segments = [(ts['start'], ts['end']) for ts in speech_timestamps]
@@ -198,12 +275,13 @@ class SileroVAD:
             audio_tensor = audio_tensor.to(self.device)
             
             # Get speech timestamps
-            speech_timestamps = self.get_speech_timestamps(
-                audio_tensor,
-                self.model,
-                threshold=self.threshold,
-                sampling_rate=self.sample_rate
-            )
+            with self._exclusive_model():
+                speech_timestamps = self.get_speech_timestamps(
+                    audio_tensor,
+                    self.model,
+                    threshold=self.threshold,
+                    sampling_rate=self.sample_rate
+                )
             
             # Collect speech chunks
             speech_audio = self.collect_chunks(speech_timestamps, audio_tensor)
@@ -258,7 +336,7 @@ class WebRTCVAD:
         """Generate frames from audio.
         
         Args:
-            audio: Numpy array of audio samples
+            audio: Numpy array of audio samples (float32 or int16 PCM)
             
         Returns:
             List of audio frames as bytes
@@ -266,8 +344,11 @@ class WebRTCVAD:
         # Calculate frame size
         frame_size = int(self.sample_rate * self.frame_duration_ms / 1000)
         
-        # Convert audio to int16
-        audio_int16 = (audio * 32767).astype(np.int16)
+        # Convert audio to int16 unless the caller already did
+        if audio.dtype == np.int16:
+            audio_int16 = audio
+        else:
+            audio_int16 = (audio * 32767).astype(np.int16)
         
         # Generate frames
         frames = []
@@ -297,24 +378,29 @@ class WebRTCVAD:
             return True  # Default to assuming speech if model not loaded
         
         try:
-            # Generate frames
-            frames = self._frame_generator(audio)
-            
             # Check each frame for speech
-            speech_frames = 0
-            for frame in frames:
-                if self.vad.is_speech(frame, self.sample_rate):
-                    speech_frames += 1
+            mask = self.get_speech_mask(audio)
             
             # Consider it speech if at least 25% of frames contain speech
-            is_speech = speech_frames >= len(frames) * 0.25
-            
-            return is_speech
+            return np.count_nonzero(mask) >= len(mask) * 0.25
             
         except Exception as e:
             logger.error(f"Error detecting speech: {e}")
             return True  # Default to assuming speech on error
     
+    def get_speech_mask(self, audio: np.ndarray) -> np.ndarray:
+        """Classify each frame of audio as speech or not.
+        
+        Args:
+            audio: Numpy array of audio samples
+            
+        Returns:
+            Boolean array with one entry per frame_duration_ms frame (the last one zero-padded)
+        """
+        frames = self._frame_generator(audio)
+        return np.fromiter((self.vad.is_speech(frame, self.sample_rate) for frame in frames),
+                           dtype=bool, count=len(frames))
+    
     def get_speech_segments(self, audio: np.ndarray) -> List[Tuple[int, int]]:
         """Get speech segments from audio.
         
@@ -329,33 +415,19 @@ class WebRTCVAD:
             return [(0, len(audio))]  # Default to full audio if model not loaded
         
         try:
-            # Generate frames
-            frames = self._frame_generator(audio)
+            # Check each frame for speech
+            mask = self.get_speech_mask(audio)
             
             # Calculate frame size
             frame_size = int(self.sample_rate * self.frame_duration_ms / 1000)
             
-            # Check each frame for speech
-            segments = []
-            start = None
-            
-            for i, frame in enumerate(frames):
-                is_speech = self.vad.is_speech(frame, self.sample_rate)
-                
-                if is_speech and start is None:
-                    # Start of speech segment
-                    start = i * frame_size
-                elif not is_speech and start is not None:
-                    # End of speech segment
-                    end = i * frame_size
-                    segments.append((start, end))
-                    start = None
-            
-            # Handle case where audio ends during speech
-            if start is not None:
-                segments.append((start, len(audio)))
+            # Segments start where the mask rises and end where it falls; a segment
+            # still open at the end of the audio ends at the last sample
+            edges = np.diff(mask.astype(np.int8), prepend=0, append=0)
+            starts = np.flatnonzero(edges == 1) * frame_size
+            ends = np.minimum(np.flatnonzero(edges == -1) * frame_size, len(audio))
             
-            return segments
+            return list(zip(starts.tolist(), ends.tolist()))
             
         except Exception as e:
             logger.error(f"Error getting speech segments: {e}")
@@ -379,9 +451,7 @@ class WebRTCVAD:
             segments = self.get_speech_segments(audio)
             
             # Concatenate speech segments
-            speech_audio = np.concatenate([audio[start:end] for start, end in segments])
-            
-            return speech_audio
+            return _collect_segments(audio, segments)
             
         except Exception as e:
             logger.error(f"Error filtering audio: {e}")
@@ -424,8 +494,15 @@ class HybridVAD:
                                     sample_rate=sample_rate,
                                     frame_duration_ms=frame_duration_ms)
         
+        # Runs Silero alongside WebRTC in get_speech_segments
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="silero")
+        
         logger.info(f"Hybrid VAD initialized with Silero threshold {silero_threshold} and WebRTC aggressiveness {webrtc_aggressiveness}")
     
+    def close(self) -> None:
+        """Stop the worker thread that runs Silero for get_speech_segments."""
+        self._executor.shutdown()
+    
     def is_speech(self, audio: np.ndarray) -> bool:
         """Check if audio contains speech using both VADs.
         
@@ -436,15 +513,11 @@ class HybridVAD:
             True if speech is detected, False otherwise
         """
         try:
-            # Get speech probability from both VADs
-            silero_speech = self.silero_vad.is_speech(audio)
-            webrtc_speech = self.webrtc_vad.is_speech(audio)
-            
             # Consider it speech if either VAD detects speech
             # This increases recall (fewer false negatives)
-            is_speech = silero_speech or webrtc_speech
-            
-            return is_speech
+            # WebRTC's GMM is far cheaper than a Silero forward pass, so ask it first
+            # and only run the model when WebRTC hears nothing
+            return self.webrtc_vad.is_speech(audio) or self.silero_vad.is_speech(audio)
             
         except Exception as e:
             logger.error(f"Error detecting speech in hybrid VAD: {e}")
@@ -460,55 +533,41 @@ class HybridVAD:
             List of (start, end) tuples in samples
         """
         try:
-            # Get speech segments from both VADs
-            silero_segments = self.silero_vad.get_speech_segments(audio)
+            # Silero's forward passes release the GIL, so they run on the worker thread
+            # while WebRTC scans the audio on this one
+            silero_future = self._executor.submit(self.silero_vad.get_speech_segments, audio)
             webrtc_segments = self.webrtc_vad.get_speech_segments(audio)
-            
-            # Merge segments
-            all_segments = silero_segments + webrtc_segments
+            all_segments = silero_future.result() + webrtc_segments
+            if not all_segments:
+                return []
             
             # Sort segments by start time
-            all_segments.sort(key=lambda x: x[0])
-            
-            # Merge overlapping segments
-            merged_segments = []
-            if all_segments:
-                current_start, current_end = all_segments[0]
-                
-                for start, end in all_segments[1:]:
-                    if start <= current_end:
-                        # Segments overlap, merge them
-                        current_end = max(current_end, end)
-                    else:
-                        # Check if segment is long enough
-                        if current_end - current_start >= self.min_speech_samples:
-                            merged_segments.append((current_start, current_end))
-                        
-                        # Start new segment
-                        current_start, current_end = start, end
-                
-                # Add the last segment if it's long enough
-                if current_end - current_start >= self.min_speech_samples:
-                    merged_segments.append((current_start, current_end))
+            segments = np.array(all_segments, dtype=np.int64)
+            segments = segments[np.argsort(segments[:, 0], kind="stable")]
+            starts, ends = segments[:, 0], segments[:, 1]
+            
+            # Merge overlapping segments: a segment starts a new group when it begins
+            # after every earlier segment has ended
+            new_group = np.empty(len(starts), dtype=bool)
+            new_group[0] = True
+            new_group[1:] = starts[1:] > np.maximum.accumulate(ends)[:-1]
+            group_starts = np.flatnonzero(new_group)
+            starts = starts[group_starts]
+            ends = np.maximum.reduceat(ends, group_starts)
+            
+            # Keep only segments that are long enough
+            long_enough = ends - starts >= self.min_speech_samples
+            starts, ends = starts[long_enough], ends[long_enough]
+            if len(starts) == 0:
+                return []
             
             # Merge segments that are close together
-            smoothed_segments = []
-            if merged_segments:
-                current_start, current_end = merged_segments[0]
-                
-                for start, end in merged_segments[1:]:
-                    if start - current_end <= self.min_silence_samples:
-                        # Segments are close, merge them
-                        current_end = end
-                    else:
-                        # Add current segment
-                        smoothed_segments.append((current_start, current_end))
-                        
-                        # Start new segment
-                        current_start, current_end = start, end
-                
-                # Add the last segment
-                smoothed_segments.append((current_start, current_end))
+            new_group = np.empty(len(starts), dtype=bool)
+            new_group[0] = True
+            new_group[1:] = starts[1:] - ends[:-1] > self.min_silence_samples
+            group_starts = np.flatnonzero(new_group)
+            group_ends = np.append(group_starts[1:] - 1, len(starts) - 1)
+            smoothed_segments = list(zip(starts[group_starts].tolist(), ends[group_ends].tolist()))
             
             return smoothed_segments
             
@@ -532,13 +591,8 @@ class HybridVAD:
             # Get speech segments
             segments = self.get_speech_segments(audio)
             
-            # Concatenate speech segments
-            if segments:
-                speech_audio = np.concatenate([audio[start:end] for start, end in segments])
-                return speech_audio
-            else:
-                # No speech detected
-                return np.array([])
+            # Concatenate speech segments (empty when no speech was detected)
+            return _collect_segments(audio, segments)
             
         except Exception as e:
             logger.error(f"Error filtering audio in hybrid VAD: {e}")
@@ -31,7 +31,11 @@ class WhisperWakeWordDetector:
         wake_word: str = "Hey Genie",
         threshold: float = 0.7,
         sample_rate: int = 16000,
-        buffer_duration: float = 3.0
+        buffer_duration: float = 3.0,
+        device: str = "cpu",
+        device_index: int = 0,
+        compute_type: str = "int8",
+        offline: bool = False
     ):
         """Initialize the wake word detector.
         
@@ -40,6 +44,10 @@ class WhisperWakeWordDetector:
             threshold: Confidence threshold (0.0-1.0)
             sample_rate: Audio sample rate in Hz
             buffer_duration: Audio buffer duration in seconds
+            device: Device to run the wake word model on ("cpu" or "cuda")
+            device_index: GPU index when device is "cuda"
+            compute_type: Compute type for the wake word model
+            offline: Never download the model; fail if it is not on disk
         """
         self.wake_word = wake_word.lower()
         self.threshold = threshold
@@ -57,26 +65,48 @@ class WhisperWakeWordDetector:
         # Import Whisper here to avoid circular imports
         try:
             from faster_whisper import WhisperModel
+            from huggingface_hub.utils import LocalEntryNotFoundError
             
             # Check if models directory exists
             models_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
             if not os.path.exists(models_dir):
                 os.makedirs(models_dir)
             
-            # Load a small model for wake word detection
-            self.model = WhisperModel(
-                model_size_or_path="tiny",
-                device="cpu",
-                compute_type="int8",
+            # Load a small model for wake word detection, preferring the local copy
+            model_kwargs = dict(
+                device=device,
+                device_index=device_index,
+                compute_type=compute_type,
                 download_root=models_dir
             )
-            
-            logger.info("Whisper wake word detector initialized")
+            try:
+                self.model = WhisperModel("tiny", local_files_only=True, **model_kwargs)
+            except LocalEntryNotFoundError:
+                if offline:
+                    raise RuntimeError(
+                        "The tiny model used for wake word detection is not downloaded and offline mode is on. "
+                        "Download it with `python scripts/download_models.py --whisper-models tiny` or turn offline mode off"
+                    ) from None
+                logger.info("Wake word model not found locally, downloading")
+                self.model = WhisperModel("tiny", **model_kwargs)
+            
+            logger.info(f"Whisper wake word detector initialized on {device}:{device_index}")
+            self._warmup()
             
         except ImportError:
             logger.error("Failed to import faster_whisper. Wake word detection will not work.")
             self.model = None
     
+    def _warmup(self) -> None:
+        """Transcribe a second of silence so the first real detection skips kernel setup."""
+        try:
+            segments, _ = self.model.transcribe(
+                np.zeros(self.sample_rate, dtype=np.float32), beam_size=1, vad_filter=False
+            )
+            list(segments)
+        except Exception as e:
+            logger.warning(f"Wake word model warm-up failed: {e}")
+    
     def add_audio(self, audio: np.ndarray) -> None:
         """Add audio to the buffer.
         
@@ -347,8 +377,8 @@ class WhisperWakeWordDetector:
             if status:
                 logger.warning(f"Audio callback status: {status}")
             
-            # Add audio to queue
-            audio_queue.put(indata.copy())
+            # Queue only the mono channel, as a 1-D copy (indata is reused by PortAudio)
+            audio_queue.put(indata[:, 0].copy())
         
         # Start audio stream
         try:
@@ -367,12 +397,11 @@ class WhisperWakeWordDetector:
                         audio = audio_queue.get(timeout=0.5)
                         
                         # Add audio to buffer and recent audio
-                        audio_flat = audio.squeeze()
-                        self.add_audio(audio_flat)
+                        self.add_audio(audio)
                         
                         # Add to recent audio for sliding window
-                        recent_audio.append(audio_flat)
-                        total_samples += len(audio_flat)
+                        recent_audio.append(audio)
+                        total_samples += len(audio)
                         
                         # Keep only enough audio for analysis
                         while total_samples > window_size * 2:
@@ -617,7 +646,7 @@ class PorcupineWakeWordDetector:
             
             try:
                 # Convert audio to int16
-                audio_int16 = (indata.squeeze() * 32767).astype(np.int16)
+                audio_int16 = (indata[:, 0] * 32767).astype(np.int16)
                 
                 # Process audio
                 result = self.porcupine.process(audio_int16)
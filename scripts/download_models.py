@@ -201,7 +201,8 @@ def main():
     
     # Parse Whisper models to download
     whisper_models = [size.strip() for size in args.whisper_models.split(",")]
-    valid_sizes = ["tiny", "base", "small", "medium", "large"]
+    valid_sizes = ["tiny", "base", "small", "medium", "large",
+                   "distil-small.en", "distil-medium.en", "distil-large-v3", "large-v3-turbo"]
     
     # Validate model sizes
     for size in whisper_models[:]:  # Create a copy to iterate over
@@ -0,0 +1,484 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Tests for the transcription loop helpers in the backend server.
+These exercise server logic directly, without audio devices or Whisper models.
+"""
+
+import gc
+import os
+import sys
+import threading
+import time
+import weakref
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+# server.py imports these at module level. sounddevice raises OSError, not
+# ImportError, when the PortAudio library is missing
+try:
+    import sounddevice  # noqa: F401
+except (ImportError, OSError) as e:
+    pytest.skip(f"could not import 'sounddevice': {e}", allow_module_level=True)
+pytest.importorskip("faster_whisper")
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python"))
+import server
+
+
+def test_ring_buffer_read_across_wrap():
+    buf = server.AudioRingBuffer(8, dtype=np.int16)
+    buf.write(np.arange(6, dtype=np.int16))
+    assert buf.read(6).tolist() == [0, 1, 2, 3, 4, 5]
+
+    # Lands on positions 6, 7, 0, 1
+    buf.write(np.arange(6, 10, dtype=np.int16))
+    assert buf.available() == 4
+    assert buf.read(10).tolist() == [6, 7, 8, 9]
+    assert buf.read(1) is None
+    assert buf.position == 10
+
+
+def test_ring_buffer_overflow_drops_oldest():
+    buf = server.AudioRingBuffer(8, dtype=np.int16)
+    buf.write(np.arange(5, dtype=np.int16))
+    buf.write(np.arange(5, 11, dtype=np.int16))
+    assert buf.available() == 8
+    assert buf.read(100).tolist() == list(range(3, 11))
+
+    # A single write larger than the buffer keeps only its newest samples
+    buf.write(np.arange(20, dtype=np.int16))
+    assert buf.read(100).tolist() == list(range(12, 20))
+    assert buf.position == 31
+
+
+def test_ring_buffer_snapshot_length():
+    buf = server.AudioRingBuffer(8, dtype=np.int16)
+    buf.write(np.arange(6, dtype=np.int16))
+    buf.read(6)
+    buf.write(np.arange(6, 12, dtype=np.int16))
+    buf.read(6)
+
+    assert buf.snapshot(4).tolist() == list(range(4, 12))  # Wrapped range
+    assert len(buf.snapshot(10, 12)) == 2
+    assert len(buf.snapshot(12)) == 0
+    # Samples the producer has overwritten are dropped from the front
+    assert buf.snapshot(0).tolist() == list(range(4, 12))
+
+
+def test_ring_buffer_skips_previous_session():
+    buf = server.AudioRingBuffer(8, dtype=np.int16)
+    buf.write(np.arange(3, dtype=np.int16))
+    buf.start_session()
+    buf.write(np.arange(3, 5, dtype=np.int16))
+    buf.skip_to_session()
+    assert buf.read(8).tolist() == [3, 4]
+
+
+def test_ring_buffer_wait_times_out():
+    buf = server.AudioRingBuffer(8, dtype=np.int16)
+    buf.write(np.zeros(2, dtype=np.int16))
+    start = time.monotonic()
+    assert not buf.wait(0.05, min_samples=4)
+    assert time.monotonic() - start >= 0.04
+
+
+def test_ring_buffer_wait_wakes_on_write_and_stop():
+    buf = server.AudioRingBuffer(8, dtype=np.int16)
+    writer = threading.Timer(0.05, buf.write, [np.zeros(4, dtype=np.int16)])
+    writer.start()
+    assert buf.wait(5.0, min_samples=4)
+    writer.join()
+
+    stopped = threading.Event()
+    waker = threading.Timer(0.05, lambda: (stopped.set(), buf.wake()))
+    waker.start()
+    assert buf.wait(5.0, min_samples=100, stop=stopped.is_set)
+    waker.join()
+
+
+class FakeTranscriber:
+    """Stands in for WhisperTranscriber: returns queued texts from submit() instead of running Whisper.
+
+    A queued tuple is decoded as several segments, each reported to on_segment.
+
+    Sizes listed in failing_sizes load the way a failed _load_model leaves them, with no model.
+    """
+
+    failing_sizes = frozenset()
+
+    def __init__(self, model_size="base", device="cpu", compute_type="auto", cpu_threads=0,
+                 backend="faster-whisper", offline=False):
+        self.model_size = model_size
+        self.texts = []
+        self.on_submit = None  # Called at the start of every submit()
+        self._executor = SimpleNamespace(shutdown=lambda wait=True: None)
+        self.unloaded = False
+        if model_size in self.failing_sizes:
+            self.model, self.load_error = None, f"no {model_size} weights"
+        else:
+            self.model, self.load_error = object(), None
+
+    def unload(self):
+        self.unloaded = True
+
+    def submit(self, audio, on_segment=None, **kwargs):
+        if self.on_submit is not None:
+            self.on_submit()
+        segments = self.texts.pop(0)
+        if isinstance(segments, str):
+            segments = (segments,)
+        for text in segments:
+            if on_segment is not None:
+                on_segment(text)
+        future = Future()
+        future.set_result(" ".join(segments))
+        return future
+
+
+class FakeAudioProcessor:
+    """Stands in for AudioProcessor: no audio device, one second of speech per snapshot.
+
+    While recording, get_audio_chunk returns a chunk of speech every few milliseconds.
+    """
+
+    def __init__(self, chunk_size=4000, device_id=None, gain=1.0):
+        self.sample_rate = 16000
+        self.chunk_size = chunk_size
+        self.vad = None
+        self.speech = np.full(self.sample_rate, 0.1, dtype=np.float32)
+        self.ring_buffer = SimpleNamespace(position=len(self.speech), skip_to_session=self.skip_to_session)
+        self.sessions_skipped = 0
+        self.is_recording = False
+
+    def skip_to_session(self):
+        self.sessions_skipped += 1
+
+    def start_recording(self):
+        self.is_recording = True
+
+    def stop_recording(self):
+        self.is_recording = False
+
+    def get_audio_chunk(self, timeout=0.1):
+        time.sleep(0.005)
+        if not self.is_recording:
+            return None
+        self.ring_buffer.position += self.chunk_size
+        return self.speech[:self.chunk_size]
+
+    def snapshot(self, start):
+        return self.speech
+
+    def get_audio_devices(self, refresh=False):
+        return []
+
+
+@pytest.fixture
+def new_server(monkeypatch):
+    """Build GenieWhisperServer through its constructor, with fake audio and Whisper.
+
+    Frontend messages are collected in srv.sent and injected text in srv.injected.
+    """
+    def build(*argv):
+        monkeypatch.setattr(sys, "argv", ["server.py", "--gpu", "false", *argv])
+        args = server.parse_args()
+        monkeypatch.setattr(server, "AudioProcessor", FakeAudioProcessor)
+        monkeypatch.setattr(server, "WhisperTranscriber", FakeTranscriber)
+        sent = []
+        monkeypatch.setattr(server.GenieWhisperServer, "_send_message", lambda self, message: sent.append(message))
+        srv = server.GenieWhisperServer(args)
+        srv.sent = sent
+        srv.injected = []
+        srv._inject_text = srv.injected.append
+        return srv
+    return build
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def process(srv, final=True):
+    """Run one utterance (or piece of one) through _process_accumulated_audio."""
+    srv.segment_start = 0
+    srv.speech_active = True
+    srv._process_accumulated_audio(final=final)
+
+
+def finals(srv):
+    return [m["text"] for m in srv.sent if m.get("final")]
+
+
+def partials(srv):
+    return [m["text"] for m in srv.sent if m["type"] == "transcription" and not m["final"]]
+
+
+def test_repeated_final_utterances_are_all_sent(new_server, caplog):
+    srv = new_server("--vad", "false")
+    srv.transcriber.texts = ["delete line"] * 3
+    for _ in range(3):
+        process(srv)
+
+    assert finals(srv) == ["delete line"] * 3
+    assert srv.injected == ["delete line"] * 3
+    assert "Error during transcription processing" not in caplog.text
+
+
+def test_repeated_partials_are_dropped_but_final_is_sent(new_server):
+    srv = new_server("--vad", "false")
+    srv.transcriber.texts = ["thank you"] * 3
+    process(srv, final=False)
+    process(srv, final=False)
+    assert partials(srv) == ["thank you"]
+
+    process(srv)
+    assert srv.injected == ["thank you", "thank you"]
+    assert finals(srv) == ["thank you"]
+
+
+def test_restart_during_transcription_ends_the_old_session(new_server):
+    srv = new_server("--vad", "false")
+    srv.SEGMENT_MAX_SECONDS = 1  # Flush a partial every four chunks
+    srv.transcriber.texts = [f"text {i}" for i in range(1000)]
+    def restart_once():
+        # Stop and start again while the loop waits on the first partial
+        srv.transcriber.on_submit = None
+        srv._stop_listening()
+        srv._start_listening()
+    srv.transcriber.on_submit = restart_once
+
+    srv._start_listening()
+    wait_until(lambda: srv.audio_processor.sessions_skipped == 2)
+    srv._stop_listening()
+    wait_until(lambda: len(finals(srv)) == 2)
+
+    # The first session's partial and its own final come before the second session starts
+    loop_messages = [m["data"] if "data" in m else (m["text"], m["final"])
+                     for m in srv.sent if "data" in m or m["type"] == "transcription"]
+    assert loop_messages[:5] == [
+        "listening_continuously", ("text 0", False),
+        ("text 1", False), ("text 1", True),  # The final, streamed and then sent whole
+        "listening_continuously",
+    ]
+
+
+def test_final_segments_are_streamed_as_decoded(new_server):
+    srv = new_server("--vad", "false")
+    srv.transcriber.texts = [("Delete line.", "Save file.")]
+    process(srv)
+
+    assert partials(srv) == ["Delete line.", "Delete line. Save file."]
+    assert finals(srv) == ["Delete line. Save file."]
+
+
+def model_key(srv, size):
+    return (size, srv.device, srv.compute_type)
+
+
+def cached_sizes(srv):
+    return [key[0] for key in srv._model_cache]
+
+
+def statuses(srv):
+    return [m["status"] for m in srv.sent if m["type"] == "status"]
+
+
+def test_cache_transcriber_keeps_outgoing_model_and_evicts_oldest(new_server):
+    srv = new_server("--model-size", "base")
+    base = srv.transcriber
+    srv.model_size = "small"
+    small = FakeTranscriber("small")
+    assert srv._cache_transcriber(model_key(srv, "small"), small)
+
+    srv.model_size = "medium"
+    medium = FakeTranscriber("medium")
+    assert srv._cache_transcriber(model_key(srv, "medium"), medium)
+
+    assert srv.transcriber is medium
+    assert cached_sizes(srv) == ["small", "medium"]
+    assert base.unloaded and not small.unloaded
+
+
+def test_cache_transcriber_never_evicts_active_model(new_server):
+    srv = new_server("--model-size", "base")
+    base = srv.transcriber
+    srv.model_size = "small"
+    small = FakeTranscriber("small")
+    srv._cache_transcriber(model_key(srv, "small"), small)
+
+    # The user switched back to base while medium was loading
+    srv._update_settings({"modelSize": "base"})
+    assert not srv._cache_transcriber(model_key(srv, "medium"), FakeTranscriber("medium"))
+
+    assert srv.transcriber is base
+    assert set(cached_sizes(srv)) == {"base", "medium"}
+    assert small.unloaded and not base.unloaded
+
+
+def test_evicted_model_is_unreferenced_before_memory_is_released(new_server):
+    srv = new_server("--model-size", "base")
+    base = weakref.ref(srv.transcriber)
+    srv.model_size = "small"
+    srv._cache_transcriber(model_key(srv, "small"), FakeTranscriber("small"))
+
+    freed = []
+    def release_gpu_memory():
+        gc.collect()
+        freed.append(base() is None)
+    srv._release_gpu_memory = release_gpu_memory
+    srv.model_size = "medium"
+    srv._cache_transcriber(model_key(srv, "medium"), FakeTranscriber("medium"))
+
+    assert freed == [True]
+
+
+def test_failed_model_load_keeps_current_transcriber(new_server, monkeypatch):
+    srv = new_server("--model-size", "base")
+    base = srv.transcriber
+    monkeypatch.setattr(FakeTranscriber, "failing_sizes", frozenset({"medium"}))
+
+    srv._update_settings({"modelSize": "medium"})
+    wait_until(lambda: not srv._models_loading)
+
+    assert srv.transcriber is base
+    assert cached_sizes(srv) == ["base"]
+    assert "Failed to load medium model" in statuses(srv)
+    assert "medium model ready" not in statuses(srv)
+
+
+def test_every_model_size_has_a_transformers_checkpoint():
+    assert set(server.WhisperTranscriber.TRANSFORMERS_CHECKPOINTS) == set(server.WhisperTranscriber.MODEL_SIZES)
+
+
+def test_missing_model_offline_names_the_download_script(monkeypatch):
+    def not_downloaded(*args, **kwargs):
+        raise server.LocalEntryNotFoundError("not in the local cache")
+    monkeypatch.setattr(server, "WhisperModel", not_downloaded)
+
+    transcriber = server.WhisperTranscriber("base", device="cpu", compute_type="int8", offline=True)
+
+    assert transcriber.model is None
+    assert "python scripts/download_models.py --whisper-models base" in transcriber.load_error
+
+
+def test_failed_startup_model_load_is_reported_to_frontend(new_server, monkeypatch):
+    monkeypatch.setattr(FakeTranscriber, "failing_sizes", frozenset({"base"}))
+    srv = new_server("--model-size", "base")
+
+    errors = [m["error"] for m in srv.sent if m["type"] == "error"]
+    assert errors == ["Failed to load base model: no base weights"]
+
+
+def test_failed_startup_model_is_reloaded_when_selected_again(new_server, monkeypatch):
+    monkeypatch.setattr(FakeTranscriber, "failing_sizes", frozenset({"base"}))
+    srv = new_server("--model-size", "base")
+    broken = srv.transcriber
+    monkeypatch.setattr(FakeTranscriber, "failing_sizes", frozenset())
+
+    srv._update_settings({"modelSize": "small"})
+    wait_until(lambda: not srv._models_loading)
+    srv._update_settings({"modelSize": "base"})
+    wait_until(lambda: not srv._models_loading)
+
+    assert srv.transcriber is not broken
+    assert srv.transcriber.model_size == "base" and srv.transcriber.model is not None
+    assert cached_sizes(srv) == ["small", "base"]
+
+
+def test_wake_word_model_on_second_gpu_uses_auto_compute_type(new_server, monkeypatch):
+    torch = pytest.importorskip("torch")
+    srv = new_server()
+    srv.device = "cuda"
+    monkeypatch.setattr(torch.cuda, "device_count", lambda: 2)
+
+    kwargs = srv._wake_word_detector_kwargs()
+
+    assert (kwargs["device"], kwargs["device_index"], kwargs["compute_type"]) == ("cuda", 1, "auto")
+
+
+def clip(value, n=400):
+    """A constant clip; at 1600 samples or fewer its fingerprint has no peak frequency."""
+    return np.full(n, value, dtype=np.float32)
+
+
+def without_peak(fingerprint):
+    return {field: value for field, value in fingerprint.items() if field != "peak_freq"}
+
+
+FULL = {"length": 16000, "mean": 0.0, "std": 0.1, "energy": 160.0, "peak_freq": 440.0}
+HALF = {"length": 8000, "mean": 0.0, "std": 0.05, "energy": 40.0, "peak_freq": 220.0}
+
+
+def test_audio_similarities_without_entries():
+    cache = server.TranscriptionCache(max_size=4)
+    # Empty audio has no fingerprint, so it gets no row
+    cache._index_fingerprint("empty", cache._compute_audio_fingerprint(np.zeros(0, dtype=np.float32)))
+
+    assert cache._fp_keys == []
+    assert cache._calculate_audio_similarities(FULL).shape == (0,)
+
+
+@pytest.mark.parametrize("query, stored, expected", [
+    (FULL, FULL, 1.0),
+    # Length 0.5, mean 1.0, std 0.5 and energy 0.25 weigh in at 0.575, and the
+    # peak frequency similarity of 0.5 is blended in at a fifth
+    (HALF, FULL, 0.56),
+    # Without a peak frequency on either side (a NaN in the matrix) there is no blend
+    (HALF, without_peak(FULL), 0.575),
+    (without_peak(HALF), FULL, 0.575),
+])
+def test_audio_similarity_to_one_entry(query, stored, expected):
+    cache = server.TranscriptionCache(max_size=4)
+    cache._index_fingerprint("stored", stored)
+
+    np.testing.assert_allclose(cache._calculate_audio_similarities(query), [expected])
+
+
+def test_eviction_moves_the_last_fingerprint_into_the_freed_row():
+    cache = server.TranscriptionCache(max_size=2)
+    a, b, c = clip(0.1), clip(0.2), clip(0.3)
+    for audio in (a, b, c):
+        cache.set(audio, "text")
+
+    # a is evicted from row 0, and c moves there from the last row
+    assert cache._fp_keys == [cache._hash_samples(c), cache._hash_samples(b)]
+    assert cache._fp_rows == {key: row for row, key in enumerate(cache._fp_keys)}
+    similarities = cache._calculate_audio_similarities(cache._compute_audio_fingerprint(c))
+    assert similarities[0] == pytest.approx(1.0)
+    assert similarities[1] < 1.0
+
+
+def test_transcription_cache_round_trips_through_disk(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = server.TranscriptionCache(max_size=4, persistent_path=path)
+    clips = [clip(0.05 * (i + 1)) for i in range(6)]
+    for i, audio in enumerate(clips):
+        cache.set(audio, f"text {i}")
+    cache._save_persistent_cache()
+
+    loaded = server.TranscriptionCache(max_size=4, persistent_path=path)
+    assert list(loaded.cache) == list(cache.cache)
+    assert sorted(loaded._fp_keys) == sorted(cache._fp_keys)
+    assert loaded.get(clips[-1]) == "text 5"
+
+
+def test_transcription_cache_drops_audio_hashed_with_another_algorithm(tmp_path, monkeypatch):
+    path = str(tmp_path / "cache.json")
+    cache = server.TranscriptionCache(max_size=4, persistent_path=path)
+    cache.set(clip(0.5), "hello there")
+    cache._save_persistent_cache()
+
+    monkeypatch.setattr(server, "AUDIO_HASH", "other")
+    loaded = server.TranscriptionCache(max_size=4, persistent_path=path)
+    assert not loaded.cache
+    assert loaded._fp_keys == []
+    # Only the audio keys depend on the hash; the phrase statistics still load
+    assert loaded.phrase_frequency[server._text_hash("hello there")] == 1
@@ -11,6 +11,8 @@ import sys
 import time
 import logging
 import numpy as np
+import pytest
+from types import SimpleNamespace
 
 # Configure logging
 logging.basicConfig(
@@ -281,6 +283,117 @@ def test_vad_wrapper():
         logger.error(traceback.format_exc())
         return False
 
+@pytest.fixture
+def vad_module(monkeypatch):
+    """The app's vad module (python/vad.py), which needs torch to import."""
+    pytest.importorskip("torch")
+    monkeypatch.syspath_prepend(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "python"))
+    import vad
+    return vad
+
+class FixedSegmentsVAD:
+    """Stands in for SileroVAD or WebRTCVAD: returns preset speech segments instead of running a model."""
+    
+    def __init__(self, **kwargs):
+        self.segments = []
+        
+    def get_speech_segments(self, audio):
+        return list(self.segments)
+
+@pytest.fixture
+def hybrid_vad(vad_module, monkeypatch):
+    """HybridVAD over two FixedSegmentsVADs, keeping 250 ms of speech and bridging 100 ms gaps."""
+    monkeypatch.setattr(vad_module, "SileroVAD", FixedSegmentsVAD)
+    monkeypatch.setattr(vad_module, "WebRTCVAD", FixedSegmentsVAD)
+    hybrid = vad_module.HybridVAD(min_speech_duration_ms=250, min_silence_duration_ms=100)
+    yield hybrid
+    hybrid.close()
+
+# At 16 kHz, segments need 4000 samples of speech and gaps of up to 1600 samples are bridged
+@pytest.mark.parametrize("silero, webrtc, expected", [
+    ([], [], []),
+    # Overlapping
+    ([(0, 3000)], [(2000, 5000)], [(0, 5000)]),
+    # Touching, and given out of order
+    ([(2000, 4500)], [(0, 2000)], [(0, 4500)]),
+    # One sample too short is dropped, exactly long enough is kept
+    ([(0, 3999)], [(10000, 14000)], [(10000, 14000)]),
+    # A 1600 sample gap is bridged, a 1601 sample one is not
+    ([(0, 4000)], [(5600, 10000)], [(0, 10000)]),
+    ([(0, 4000)], [(5601, 10000)], [(0, 4000), (5601, 10000)]),
+    # Short segments are dropped before gaps are bridged, so they don't bridge anything
+    ([(0, 4000), (7000, 12000)], [(4500, 5000)], [(0, 4000), (7000, 12000)]),
+])
+def test_hybrid_vad_merges_segments(hybrid_vad, silero, webrtc, expected):
+    hybrid_vad.silero_vad.segments = silero
+    hybrid_vad.webrtc_vad.segments = webrtc
+    
+    assert hybrid_vad.get_speech_segments(np.zeros(16000, dtype=np.float32)) == expected
+
+class FirstSampleVad:
+    """Stands in for webrtcvad.Vad: a frame is speech when its first sample is nonzero."""
+    
+    def __init__(self, aggressiveness):
+        self.aggressiveness = aggressiveness
+        
+    def is_speech(self, frame, sample_rate):
+        return np.frombuffer(frame, dtype=np.int16)[0] != 0
+
+def frames_audio(frame_flags, frame_size, trim=0):
+    """int16 audio with one frame_size frame per flag, nonzero for speech frames,
+    with the last trim samples cut off."""
+    audio = np.repeat(np.array(frame_flags, dtype=np.int16) * 1000, frame_size)
+    return audio[:len(audio) - trim]
+
+@pytest.mark.parametrize("frame_flags, trim, expected", [
+    # All silence
+    ([0, 0, 0], 0, []),
+    # All speech
+    ([1, 1, 1], 0, [(0, 1440)]),
+    # Speech at the start, closed by the first silent frame
+    ([1, 1, 0, 0], 0, [(0, 960)]),
+    # Speech still open at the end, where the last frame is a partial one
+    ([0, 1, 1], 200, [(480, 1240)]),
+])
+def test_webrtc_speech_segments(vad_module, monkeypatch, frame_flags, trim, expected):
+    monkeypatch.setitem(sys.modules, "webrtcvad", SimpleNamespace(Vad=FirstSampleVad))
+    webrtc = vad_module.WebRTCVAD(sample_rate=16000, frame_duration_ms=30)
+    audio = frames_audio(frame_flags, 480, trim)
+    
+    assert webrtc.get_speech_mask(audio).tolist() == [bool(flag) for flag in frame_flags]
+    assert webrtc.get_speech_segments(audio) == expected
+
+class CountingSileroModel:
+    """Silero stand-in that records state resets and calls."""
+    
+    def __init__(self):
+        self.resets = 0
+        self.calls = 0
+        
+    def reset_states(self):
+        self.resets += 1
+        
+    def __call__(self, audio, sample_rate):
+        self.calls += 1
+        return SimpleNamespace(item=lambda: 0.9)
+
+def test_silero_instances_sharing_a_model_reset_its_state(vad_module, monkeypatch):
+    model = CountingSileroModel()
+    shared = vad_module._SharedSileroModel(model, None)
+    # Both instances pick the "loaded" model up from the process-wide cache
+    monkeypatch.setattr(vad_module.torch.cuda, "is_available", lambda: False)
+    monkeypatch.setitem(vad_module._SILERO_MODELS, (False, "cpu"), shared)
+    vads = [vad_module.SileroVAD(threshold=0.5, sample_rate=16000) for _ in range(2)]
+    assert all(silero.model is model for silero in vads)
+    audio = np.zeros(512, dtype=np.float32)
+    
+    assert vads[0].is_speech(audio) and vads[0].is_speech(audio)
+    assert model.resets == 1  # Consecutive calls by one instance keep their state
+    assert vads[1].is_speech(audio)
+    assert model.resets == 2  # Another instance starts from fresh state
+    assert model.calls == 3
+    assert not shared.lock.locked()
+
 if __name__ == "__main__":
     success = test_webrtc_vad() and test_vad_wrapper()
     if success: